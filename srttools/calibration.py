@@ -12,26 +12,28 @@ import os
 import sys
 import glob
 import re
+import bisect
+import functools
 import warnings
 import traceback
 import configparser
-import copy
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 from astropy import log
 import astropy.units as u
-from scipy.optimize import curve_fit
 from astropy.table import Table, Column
 
 from .scan import Scan, list_scans
 from .read_config import read_config, sample_config_file, get_config_file
 from .fit import fit_baseline_plus_bell
 from .io import mkdir_p
-from .utils import standard_byte
+from .utils import standard_byte, jit, HAS_NUMBA, _init_scan_worker
 from .utils import HAS_STATSM, calculate_moments, scantype
 
 try:
     import matplotlib.pyplot as plt
+    from matplotlib import cm
     from matplotlib.gridspec import GridSpec
 
     HAS_MPL = True
@@ -39,15 +41,12 @@ except ImportError:
     HAS_MPL = False
 
 CALIBRATOR_CONFIG = None
+_FLUX_RE = re.compile(r"^Flux")
 
 
 __all__ = ["CalibratorTable", "read_calibrator_config"]
 
 
-def _constant(x, p):
-    return p
-
-
 FLUX_QUANTITIES = {
     "Jy/beam": "Flux",
     "Jy/pixel": "Flux Integral",
@@ -99,19 +98,26 @@ def read_calibrator_config():
     >>> 'coeffs' in calibs['DummyCal']['CoeffTable']
     True
     """
-    flux_re = re.compile(r"^Flux")
+    return _parse_calibrator_files(_calibrator_file_list())
+
+
+def _calibrator_file_list():
     curdir = os.path.dirname(__file__)
     calibdir = os.path.join(curdir, "data", "calibrators")
-    calibrator_file_list = glob.glob(os.path.join(calibdir, "*.ini"))
+    return glob.glob(os.path.join(calibdir, "*.ini"))
 
+
+def _parse_calibrator_files(calibrator_file_list):
     configs = {}
     for cfile in calibrator_file_list:
         cparser = configparser.ConfigParser()
-        cparser.read(cfile)
+        with open(cfile) as fobj:
+            cparser.read_file(fobj)
 
         log.info(f"Reading {cfile}")
-        if "CoeffTable" not in list(cparser.sections()):
-            configs[cparser.get("Info", "Name")] = {
+        name = cparser.get("Info", "Name")
+        if "CoeffTable" not in cparser.sections():
+            conf = configs[name] = {
                 "Kind": "FreqList",
                 "Frequencies": [],
                 "Bandwidths": [],
@@ -120,37 +126,87 @@ def read_calibrator_config():
             }
 
             for section in cparser.sections():
-                if not flux_re.match(section):
+                if not _FLUX_RE.match(section):
                     continue
-                configs[cparser.get("Info", "Name")]["Frequencies"].append(
-                    float(cparser.get(section, "freq"))
-                )
-                configs[cparser.get("Info", "Name")]["Bandwidths"].append(
+                conf["Frequencies"].append(float(cparser.get(section, "freq")))
+                conf["Bandwidths"].append(
                     float(cparser.get(section, "bwidth"))
                 )
-                configs[cparser.get("Info", "Name")]["Fluxes"].append(
-                    float(cparser.get(section, "flux"))
-                )
-                configs[cparser.get("Info", "Name")]["Flux Errors"].append(
+                conf["Fluxes"].append(float(cparser.get(section, "flux")))
+                conf["Flux Errors"].append(
                     float(cparser.get(section, "eflux"))
                 )
+            # Sort by frequency, to look up the closest one by bisection
+            order = np.argsort(conf["Frequencies"], kind="stable")
+            for key in ["Frequencies", "Bandwidths", "Fluxes", "Flux Errors"]:
+                conf[key] = [conf[key][i] for i in order]
         else:
-            configs[cparser.get("Info", "Name")] = {
+            configs[name] = {
                 "CoeffTable": dict(cparser.items("CoeffTable")),
                 "Kind": "CoeffTable",
             }
     return configs
 
 
-def _get_calibrator_flux(calibrator, frequency, bandwidth=1, time=0):
+def _closest_index(sorted_values, value):
+    """Index of the element of a sorted sequence that is closest to value.
+
+    As with ``np.argmin(np.abs(sorted_values - value))``, ties go to the
+    first element.
+
+    Examples
+    --------
+    >>> _closest_index([1, 2, 4], 3)
+    1
+    >>> _closest_index([1, 2, 4], 3.5)
+    2
+    >>> _closest_index([1, 2, 4], -1)
+    0
+    >>> _closest_index([1, 2, 4], 10)
+    2
+    >>> _closest_index([1, 2, 2, 4], 2)
+    1
+    """
+    idx = bisect.bisect_left(sorted_values, value)
+    if idx == 0:
+        return 0
+    if idx == len(sorted_values):
+        return idx - 1
+    if sorted_values[idx] - value < value - sorted_values[idx - 1]:
+        return idx
+    return idx - 1
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_calibrator_config(signature):
+    """Parse the calibrator files, only once for a given file signature.
+
+    ``signature`` is a tuple of (file name, modification time) pairs, so
+    that the files are parsed again only if they change on disk.
+    """
+    return _parse_calibrator_files([fname for fname, _ in signature])
+
+
+def _calibrator_config():
+    """Get the calibrator configuration, parsing the files only if needed."""
     global CALIBRATOR_CONFIG
 
+    signature = tuple(
+        sorted((f, os.path.getmtime(f)) for f in _calibrator_file_list())
+    )
+    CALIBRATOR_CONFIG = _cached_calibrator_config(signature)
+    return CALIBRATOR_CONFIG
+
+
+def _get_calibrator_flux(
+    calibrator, frequency, bandwidth=1, time=0, config=None
+):
     log.info(f"Getting calibrator flux from {calibrator}")
 
-    if CALIBRATOR_CONFIG is None:
-        CALIBRATOR_CONFIG = read_calibrator_config()
+    if config is None:
+        config = _calibrator_config()
 
-    calibrators = CALIBRATOR_CONFIG.keys()
+    calibrators = config.keys()
 
     for cal in calibrators:
         if cal == calibrator:
@@ -159,16 +215,157 @@ def _get_calibrator_flux(calibrator, frequency, bandwidth=1, time=0):
     else:
         return None, None
 
-    conf = CALIBRATOR_CONFIG[calibrator]
+    conf = config[calibrator]
 
     # find closest value among frequencies
     if conf["Kind"] == "FreqList":
-        idx = (np.abs(np.array(conf["Frequencies"]) - frequency)).argmin()
+        idx = _closest_index(conf["Frequencies"], frequency)
         return conf["Fluxes"][idx], conf["Flux Errors"][idx]
     elif conf["Kind"] == "CoeffTable":
         return _calc_flux_from_coeffs(conf, frequency, bandwidth, time)
 
 
+def _treat_scans(scan_list, max_workers, config_file=None, **kwargs):
+    """Yield the results of ``_treat_scan``, in the input order.
+
+    The config file is passed explicitly, as worker processes do not always
+    inherit the current one.
+    """
+    nscan = len(scan_list)
+    scan_workers = min(max_workers, nscan)
+    kwargs["config_file"] = config_file
+    # Scans are independent: distribute them over multiple processes
+    if scan_workers > 1:
+        for i_s, s in enumerate(scan_list):
+            log.info("{}/{}: Loading {}".format(i_s + 1, nscan, s))
+        with ProcessPoolExecutor(
+            max_workers=scan_workers,
+            initializer=_init_scan_worker,
+            initargs=(config_file,),
+        ) as executor:
+            yield from executor.map(
+                functools.partial(_treat_scan, **kwargs), scan_list
+            )
+    else:
+        for i_s, s in enumerate(scan_list):
+            log.info("{}/{}: Loading {}".format(i_s + 1, nscan, s))
+            yield _treat_scan(s, **kwargs)
+
+
+if HAS_NUMBA:
+
+    @jit(nopython=True, error_model="numpy")
+    def _calibration_factors(
+        flux,
+        eflux,
+        counts,
+        ecounts,
+        width,
+        ewidth,
+        flux_over_counts,
+        flux_over_counts_err,
+        flux_integral_over_counts,
+        flux_integral_over_counts_err,
+    ):  # pragma: no cover
+        """Fill the output arrays with the conversion factors, in one pass.
+
+        Examples
+        --------
+        >>> ones = np.ones(2)
+        >>> out = np.zeros((4, 2))
+        >>> _calibration_factors(ones * 2, ones, ones, ones, ones, ones,
+        ...                      *out)
+        >>> np.allclose(out[0], 2) and np.allclose(out[1], 3)
+        True
+        >>> np.allclose(out[2], 1 / np.pi)
+        True
+        >>> np.allclose(out[3], 3.5 / np.pi)
+        True
+        """
+        for i in range(flux.size):
+            fc = flux[i] / counts[i]
+            relative_err = ecounts[i] / counts[i] + eflux[i] / flux[i]
+            flux_over_counts[i] = fc
+            flux_over_counts_err[i] = relative_err * fc
+
+            # Volume in a beam: For a 2-d Gaussian with amplitude A and sigmas
+            # sx and sy, this is 2 pi A sx sy. The relative error on the
+            # volume is that of the counts, plus the contribution of the width.
+            fic = fc / (2 * np.pi * (width[i] * width[i]))
+            relative_err += 2 * ewidth[i] / width[i]
+            flux_integral_over_counts[i] = fic
+            flux_integral_over_counts_err[i] = relative_err * fic
+
+
+else:
+
+    def _calibration_factors(
+        flux,
+        eflux,
+        counts,
+        ecounts,
+        width,
+        ewidth,
+        flux_over_counts,
+        flux_over_counts_err,
+        flux_integral_over_counts,
+        flux_integral_over_counts_err,
+    ):
+        """Fill the output arrays with the conversion factors."""
+        flux_over_counts[:] = flux / counts
+        relative_err = ecounts / counts + eflux / flux
+        flux_over_counts_err[:] = relative_err * flux_over_counts
+
+        flux_integral_over_counts[:] = flux_over_counts / (
+            2 * np.pi * np.square(width)
+        )
+        relative_err += 2 * ewidth / width
+        flux_integral_over_counts_err[:] = (
+            relative_err * flux_integral_over_counts
+        )
+
+
+if HAS_NUMBA:
+
+    @jit(nopython=True, error_model="numpy")
+    def _source_flux(
+        counts, counts_err, fc, fce, flux, flux_err
+    ):  # pragma: no cover
+        """Fill the output arrays with the flux density and its error.
+
+        Examples
+        --------
+        >>> ones = np.ones(2)
+        >>> out = np.zeros((2, 2))
+        >>> _source_flux(ones * 2, ones, ones * 3, ones, *out)
+        >>> np.allclose(out[0], 6) and np.allclose(out[1], 5)
+        True
+        """
+        for i in range(counts.size):
+            calculated_flux = counts[i] * fc[i]
+            flux[i] = calculated_flux
+            flux_err[i] = (
+                counts_err[i] / counts[i] + fce[i] / fc[i]
+            ) * calculated_flux
+
+
+else:
+
+    def _source_flux(counts, counts_err, fc, fce, flux, flux_err):
+        """Fill the output arrays with the flux density and its error."""
+        flux[:] = counts * fc
+        flux_err[:] = (counts_err / counts + fce / fc) * flux
+
+
+def _fit_figure(name):
+    """Create a figure with the fit and residual panels, to be reused."""
+    fig = plt.figure(name)
+    gs = GridSpec(2, 1, height_ratios=(3, 1))
+    ax0 = fig.add_subplot(gs[0])
+    ax1 = fig.add_subplot(gs[1], sharex=ax0)
+    return fig, (ax0, ax1)
+
+
 def _treat_scan(scan_path, plot=False, **kwargs):
     scandir, sname = os.path.split(scan_path)
     if plot and HAS_MPL:
@@ -195,35 +392,55 @@ def _treat_scan(scan_path, plot=False, **kwargs):
     F, N = np.meshgrid(feeds, chan_nums)
     F = F.flatten()
     N = N.flatten()
+
+    # Convert the coordinates of all feeds at once, not for each channel
+    all_ras = np.degrees(scan["ra"])
+    all_decs = np.degrees(scan["dec"])
+    all_els = np.degrees(scan["el"])
+    all_azs = np.degrees(scan["az"])
+
+    # These are the same for all feeds and channels
+    time = np.mean(scan["time"][:])
+    mean_els = np.mean(all_els, axis=0)
+    mean_azs = np.mean(all_azs, axis=0)
+    source = scan.meta["SOURCE"]
+    pnt_ra = np.degrees(scan.meta["RA"])
+    pnt_dec = np.degrees(scan.meta["Dec"])
+
+    # The scan direction only depends on the feed, not on the channel
+    feed_scantypes = {}
+    for feed in feeds:
+        ras = all_ras[:, feed]
+        decs = all_decs[:, feed]
+        temp_x, _ = scantype(ras, decs, all_els[:, feed], all_azs[:, feed])
+        feed_scantypes[feed] = temp_x, scantype(ras, decs)
+
+    if plot and HAS_MPL:
+        # Create the figures once, and only clear the axes for each fit
+        fit_fig, fit_axes = _fit_figure("Fit information")
+        temp_fig, temp_axes = _fit_figure("Fit information - temperature")
+
     rows = []
     for feed, nch in zip(F, N):
         channel = chans[nch]
 
-        ras = np.degrees(scan["ra"][:, feed])
-        decs = np.degrees(scan["dec"][:, feed])
-        els = np.degrees(scan["el"][:, feed])
-        azs = np.degrees(scan["az"][:, feed])
-        time = np.mean(scan["time"][:])
-        el = np.mean(els)
-        az = np.mean(azs)
-        source = scan.meta["SOURCE"]
-        pnt_ra = np.degrees(scan.meta["RA"])
-        pnt_dec = np.degrees(scan.meta["Dec"])
+        el = mean_els[feed]
+        az = mean_azs[feed]
         frequency = scan[channel].meta["frequency"]
         bandwidth = scan[channel].meta["bandwidth"]
         temperature = scan[channel + "-Temp"]
 
         y = scan[channel]
 
+        temp_x, (x, scan_type) = feed_scantypes[feed]
+
         # Fit for gain curves
-        x, _ = scantype(ras, decs, els, azs)
         temperature_model, _ = fit_baseline_plus_bell(
-            x, temperature, kind="gauss"
+            temp_x, temperature, kind="gauss"
         )
         source_temperature = temperature_model["Bell"].amplitude.value
 
         # Fit RA and/or Dec
-        x, scan_type = scantype(ras, decs)
         model, fit_info = fit_baseline_plus_bell(x, y, kind="gauss")
 
         std = np.std(np.diff(y)) / np.sqrt(2)
@@ -316,10 +533,9 @@ def _treat_scan(scan_path, plot=False, **kwargs):
         rows.append(new_row)
 
         if plot and HAS_MPL:
-            fig = plt.figure("Fit information")
-            gs = GridSpec(2, 1, height_ratios=(3, 1))
-            ax0 = plt.subplot(gs[0])
-            ax1 = plt.subplot(gs[1], sharex=ax0)
+            ax0, ax1 = fit_axes
+            ax0.cla()
+            ax1.cla()
 
             ax0.plot(x, y, label="Data")
             ax0.plot(
@@ -338,14 +554,13 @@ def _treat_scan(scan_path, plot=False, **kwargs):
 
             ax0.legend()
 
-            plt.savefig(
+            fit_fig.savefig(
                 os.path.join(outdir, "Feed{}_chan{}.png".format(feed, nch))
             )
-            plt.close(fig)
-            fig = plt.figure("Fit information - temperature")
-            gs = GridSpec(2, 1, height_ratios=(3, 1))
-            ax0 = plt.subplot(gs[0])
-            ax1 = plt.subplot(gs[1], sharex=ax0)
+
+            ax0, ax1 = temp_axes
+            ax0.cla()
+            ax1.cla()
 
             ax0.plot(x, temperature, label="Data")
             ax0.plot(x, temperature_model(x), label="Fit")
@@ -358,12 +573,15 @@ def _treat_scan(scan_path, plot=False, **kwargs):
             ax1.set_ylabel("Residual (cts)")
 
             ax0.legend()
-            plt.savefig(
+            temp_fig.savefig(
                 os.path.join(
                     outdir, "Feed{}_chan{}_temp.png".format(feed, nch)
                 )
             )
-            plt.close(fig)
+
+    if plot and HAS_MPL:
+        plt.close(fit_fig)
+        plt.close(temp_fig)
 
     return True, rows
 
@@ -414,11 +632,11 @@ class CalibratorTable(Table):
         ]
 
         dtype = [
-            "S200",
-            "S200",
-            "S200",
-            "S200",
-            "S200",
+            "U200",
+            "U200",
+            "U200",
+            "U200",
+            "U200",
             int,
             np.double,
             float,
@@ -461,6 +679,7 @@ class CalibratorTable(Table):
         config_file=None,
         nofilt=False,
         plot=False,
+        max_workers=1,
     ):
         """Load source table from a list of scans.
 
@@ -488,6 +707,9 @@ class CalibratorTable(Table):
             :class:`srttools.scan.clean_scan_using_variability`
         plot : bool
             Plot diagnostic plots? Default False, True if debug is True.
+        max_workers : int
+            Maximum number of processes used to fit the scans. Default 1,
+            i.e. the scans are fitted serially. None means the number of CPUs
 
         Returns
         -------
@@ -502,32 +724,57 @@ class CalibratorTable(Table):
         if debug is True:
             plot = True
 
+        if config_file is None:
+            config_file = get_config_file()
+
         if scan_list is None:
-            if config_file is None:
-                config_file = get_config_file()
             config = read_config(config_file)
             scan_list = list_scans(
                 config["datadir"], config["list_of_directories"]
             ) + list_scans(config["datadir"], config["calibrator_directories"])
             scan_list.sort()
-        nscan = len(scan_list)
 
-        out_retval = False
-        for i_s, s in enumerate(scan_list):
-            log.info("{}/{}: Loading {}".format(i_s + 1, nscan, s))
-
-            retval, rows = _treat_scan(
-                s, plot=plot, debug=debug, freqsplat=freqsplat, nofilt=nofilt
-            )
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
 
+        out_retval = False
+        new_rows = []
+        for retval, rows in _treat_scans(
+            scan_list,
+            max_workers,
+            config_file=config_file,
+            plot=plot,
+            debug=debug,
+            freqsplat=freqsplat,
+            nofilt=nofilt,
+        ):
             if retval:
                 out_retval = True
+                new_rows.extend(rows)
 
-                for r in rows:
-                    self.add_row(r)
+        self._add_rows(new_rows)
 
         return out_retval
 
+    def _add_rows(self, rows):
+        """Append many rows at once, with the same conversions as add_row.
+
+        Each call to ``add_row`` copies all the columns of the table.
+        """
+        if len(rows) == 0:
+            return
+        newcols = []
+        for col, values in zip(self.columns.values(), zip(*rows)):
+            # None becomes NaN, and Quantities are converted to their value
+            values = np.array(
+                [np.array(v, dtype=col.dtype) for v in values], dtype=col.dtype
+            )
+            newcols.append(col.insert(len(col), values))
+        # All columns change length together, so they are replaced at once.
+        # The table metadata, with the calibration info, is not touched.
+        self.remove_columns(self.colnames)
+        self.add_columns(newcols, copy=False)
+
     def write(self, fname, *args, **kwargs):
         """Same as Table.write, but adds path information for HDF5."""
         if fname.endswith(".hdf5"):
@@ -586,16 +833,33 @@ class CalibratorTable(Table):
         if not self.check_not_empty():
             return
 
-        for it, t in enumerate(self["Time"]):
-            source = self["Source"][it]
-            frequency = self["Frequency"][it] / 1000
-            bandwidth = self["Bandwidth"][it] / 1000
-            flux, eflux = _get_calibrator_flux(
-                source, frequency, bandwidth, time=t
+        # All channels and feeds of a scan share the same source, frequency
+        # setup and time: look up the flux once per distinct combination
+        keys = list(
+            zip(
+                self["Source"],
+                self["Frequency"],
+                self["Bandwidth"],
+                self["Time"],
+            )
+        )
+        config = _calibrator_config()
+        flux_dict = {}
+        for key in set(keys):
+            source, frequency, bandwidth, t = key
+            flux_dict[key] = _get_calibrator_flux(
+                source,
+                frequency / 1000,
+                bandwidth / 1000,
+                time=t,
+                config=config,
             )
 
-            self["Flux"][it] = flux
-            self["Flux Err"][it] = eflux
+        fluxes, efluxes = zip(*[flux_dict[key] for key in keys])
+
+        # Sources that are not calibrators (flux None) get NaN, as before
+        self["Flux"][:] = np.array(fluxes, dtype=float)
+        self["Flux Err"][:] = np.array(efluxes, dtype=float)
 
     def calibrate(self):
         """Calculate the calibration constants.
@@ -623,37 +887,24 @@ class CalibratorTable(Table):
         if not self.check_not_empty():
             return
 
-        flux = self["Flux"] * u.Jy
-        eflux = self["Flux Err"] * u.Jy
-        counts = self["Counts"] * u.ct
-        ecounts = self["Counts Err"] * u.ct
-        width = np.radians(self["Width"]) * u.radian
-        ewidth = np.radians(self["Width Err"]) * u.radian
-
-        # Volume in a beam: For a 2-d Gaussian with amplitude A and sigmas sx
-        # and sy, this is 2 pi A sx sy.
-        total = 2 * np.pi * counts * width ** 2
-        etotal = 2 * np.pi * ecounts * width ** 2
-
-        flux_integral_over_counts = flux / total
-        flux_integral_over_counts_err = (
-            etotal / total + eflux / flux + 2 * ewidth / width
-        ) * flux_integral_over_counts
-
-        flux_over_counts = flux / counts
-        flux_over_counts_err = (
-            ecounts / counts + eflux / flux
-        ) * flux_over_counts
-
-        self["Flux/Counts"][:] = flux_over_counts.to(u.Jy / u.ct).value
-        self["Flux/Counts Err"][:] = flux_over_counts_err.to(u.Jy / u.ct).value
-
-        self["Flux Integral/Counts"][:] = flux_integral_over_counts.to(
-            u.Jy / u.ct / u.steradian
-        ).value
-        self["Flux Integral/Counts Err"][:] = flux_integral_over_counts_err.to(
-            u.Jy / u.ct / u.steradian
-        ).value
+        # Flux densities in Jy, counts in ct, widths in radians. The output
+        # columns are in Jy / ct and Jy / ct / sr.
+        flux = np.asarray(self["Flux"], dtype=float)
+        eflux = np.asarray(self["Flux Err"], dtype=float)
+        counts = np.asarray(self["Counts"], dtype=float)
+        ecounts = np.asarray(self["Counts Err"], dtype=float)
+        width = np.radians(self["Width"], dtype=float)
+        ewidth = np.radians(self["Width Err"], dtype=float)
+
+        results = np.zeros((4, len(self)))
+        _calibration_factors(
+            flux, eflux, counts, ecounts, width, ewidth, *results
+        )
+
+        self["Flux/Counts"][:] = results[0]
+        self["Flux/Counts Err"][:] = results[1]
+        self["Flux Integral/Counts"][:] = results[2]
+        self["Flux Integral/Counts Err"][:] = results[3]
 
     def compute_conversion_function(self, map_unit="Jy/beam", good_mask=None):
         """Compute the conversion between Jy and counts.
@@ -687,22 +938,41 @@ class CalibratorTable(Table):
 
         flux_quantity = _get_flux_quantity(map_unit)
 
-        channels = list(set(self["Chan"]))
-        for channel in channels:
-            good_chans = (self["Chan"] == channel) & good_mask
+        # Get plain arrays once: masking them is much faster than masking
+        # table columns, for each channel
+        all_f_c_ratio = np.asarray(self[flux_quantity + "/Counts"])
+        all_f_c_ratio_err = np.asarray(self[flux_quantity + "/Counts Err"])
+        all_elvs = np.radians(np.asarray(self["Elevation"]))
+        good_mask = np.asarray(good_mask)
+
+        # Group the rows by channel with a single sort, instead of comparing
+        # the whole channel column with each channel name
+        all_chans = self["Chan"]
+        _, first_rows, chan_idx, chan_counts = np.unique(
+            np.asarray(all_chans),
+            return_index=True,
+            return_inverse=True,
+            return_counts=True,
+        )
+        rows_by_chan = np.split(
+            np.argsort(chan_idx, kind="stable"), np.cumsum(chan_counts)[:-1]
+        )
+        for first_row, rows in zip(first_rows, rows_by_chan):
+            channel = all_chans[first_row]
+            rows = rows[good_mask[rows]]
 
-            f_c_ratio = self[flux_quantity + "/Counts"][good_chans]
-            f_c_ratio_err = self[flux_quantity + "/Counts Err"][good_chans]
-            elvs = np.radians(self["Elevation"][good_chans])
+            f_c_ratio = all_f_c_ratio[rows]
+            f_c_ratio_err = all_f_c_ratio_err[rows]
+            elvs = all_elvs[rows]
 
             good_fc = (f_c_ratio == f_c_ratio) & (f_c_ratio > 0)
             good_fce = (f_c_ratio_err == f_c_ratio_err) & (f_c_ratio_err >= 0)
 
             good = good_fc & good_fce
 
-            x_to_fit = np.array(elvs[good])
-            y_to_fit = np.array(f_c_ratio[good])
-            ye_to_fit = np.array(f_c_ratio_err[good])
+            x_to_fit = elvs[good]
+            y_to_fit = f_c_ratio[good]
+            ye_to_fit = f_c_ratio_err[good]
 
             order = np.argsort(x_to_fit)
             x_to_fit = x_to_fit[order]
@@ -774,11 +1044,11 @@ class CalibratorTable(Table):
 
         fc = self.calibration[channel].predict(X)
 
-        goodch = self["Chan"] == channel
-        good = good_mask & goodch
-        fce = np.sqrt(
-            np.mean(self[flux_quantity + "/Counts Err"][good] ** 2)
-        ) + np.zeros_like(fc)
+        good = good_mask & np.asarray(self["Chan"] == channel)
+        fc_err = np.asarray(self[flux_quantity + "/Counts Err"], dtype=float)
+        # Root mean square of the errors, without a temporary array
+        fc_err = fc_err[good]
+        fce = np.linalg.norm(fc_err) / np.sqrt(fc_err.size) + np.zeros_like(fc)
 
         if len(fc) == 1:
             fc, fce = fc[0], fce[0]
@@ -818,29 +1088,31 @@ class CalibratorTable(Table):
 
         good_chans = np.ones(len(self["Time"]), dtype=bool)
         if channel is not None:
-            good_chans = self["Chan"] == channel
+            good_chans = np.asarray(self["Chan"] == channel)
 
-        good_chans = good_chans & good_mask
+        good_chans = good_chans & np.asarray(good_mask)
 
-        f_c_ratio = self[flux_quantity + "/Counts"][good_chans]
-        f_c_ratio_err = self[flux_quantity + "/Counts Err"][good_chans]
-        times = self["Time"][good_chans]
+        f_c_ratio = np.asarray(self[flux_quantity + "/Counts"])[good_chans]
+        f_c_ratio_err = np.asarray(self[flux_quantity + "/Counts Err"])[
+            good_chans
+        ]
+        times = np.asarray(self["Time"])[good_chans]
 
         good_fc = (f_c_ratio == f_c_ratio) & (f_c_ratio > 0)
         good_fce = (f_c_ratio_err == f_c_ratio_err) & (f_c_ratio_err >= 0)
 
         good = good_fc & good_fce
 
-        x_to_fit = np.array(times[good])
-        y_to_fit = np.array(f_c_ratio[good])
-        ye_to_fit = np.array(f_c_ratio_err[good])
+        x_to_fit = times[good]
+        y_to_fit = f_c_ratio[good]
+        ye_to_fit = f_c_ratio_err[good]
 
-        p = [np.median(y_to_fit)]
-        pcov = np.array([[np.median(ye_to_fit) ** 2]])
+        fc = np.median(y_to_fit)
+        fce = np.median(ye_to_fit)
         first = True
 
         while 1:
-            bad = np.abs((y_to_fit - _constant(x_to_fit, p)) / ye_to_fit) > 5
+            bad = np.abs((y_to_fit - fc) / ye_to_fit) > 5
 
             if not np.any(bad) and not first:
                 break
@@ -859,12 +1131,18 @@ class CalibratorTable(Table):
             y_to_fit = y_to_fit[good]
             ye_to_fit = ye_to_fit[good]
 
-            p, pcov = curve_fit(
-                _constant, x_to_fit, y_to_fit, sigma=ye_to_fit, p0=p
-            )
+            # Fit a constant: this is the weighted mean. As curve_fit does,
+            # the uncertainty is rescaled by the reduced chi squared
+            weights = 1 / ye_to_fit ** 2
+            fc = np.sum(weights * y_to_fit) / np.sum(weights)
+            if y_to_fit.size > 1:
+                chisq = np.sum(weights * (y_to_fit - fc) ** 2)
+                fce = np.sqrt(chisq / (y_to_fit.size - 1) / np.sum(weights))
+            else:
+                # No degrees of freedom left: as with curve_fit, the
+                # uncertainty cannot be estimated
+                fce = np.inf
             first = False
-        fc = p[0]
-        fce = np.sqrt(pcov[0, 0])
 
         return fc, fce
 
@@ -900,7 +1178,7 @@ class CalibratorTable(Table):
         else:
             good_source = self["Source"] == source
 
-        non_source = np.logical_not(good_source)
+        non_source = ~good_source
 
         if channel is None:
             channels = [s for s in set(self["Chan"])]
@@ -920,22 +1198,32 @@ class CalibratorTable(Table):
                 good_mask=non_source,
             )
 
-            calculated_flux = copy.deepcopy(self["Calculated Flux"])
-            calculated_flux_err = copy.deepcopy(self["Calculated Flux Err"])
-            counts = np.array(self["Counts"])
-            counts_err = np.array(self["Counts Err"])
-
-            calculated_flux[good] = counts[good] * fc
-            calculated_flux_err[good] = (
-                counts_err[good] / counts[good] + fce / fc
-            ) * calculated_flux[good]
+            # Only the rows of this source and channel change
+            counts = np.asarray(self["Counts"][good], dtype=float)
+            counts_err = np.asarray(self["Counts Err"][good], dtype=float)
+
+            # Jy_over_counts returns scalars when there is a single row
+            fc = np.broadcast_to(np.atleast_1d(fc), counts.shape)
+            fce = np.broadcast_to(np.atleast_1d(fce), counts.shape)
+
+            calculated_flux = np.zeros_like(counts)
+            calculated_flux_err = np.zeros_like(counts)
+            _source_flux(
+                counts,
+                counts_err,
+                fc.astype(float),
+                fce.astype(float),
+                calculated_flux,
+                calculated_flux_err,
+            )
 
-            self["Calculated Flux"][:] = calculated_flux
-            self["Calculated Flux Err"][:] = calculated_flux_err
+            self["Calculated Flux"][good] = calculated_flux
+            self["Calculated Flux Err"][good] = calculated_flux_err
 
-            mean_flux.append(np.mean(calculated_flux[good]))
+            mean_flux.append(np.mean(calculated_flux))
             mean_flux_err.append(
-                np.sqrt(np.mean(calculated_flux_err[good] ** 2))
+                np.linalg.norm(calculated_flux_err)
+                / np.sqrt(calculated_flux_err.size)
             )
 
         return mean_flux, mean_flux_err
@@ -953,7 +1241,8 @@ class CalibratorTable(Table):
             True if, for all calibrators, the tabulated and calculated values
             of the flux are consistent. False otherwise.
         """
-        is_cal = (~np.isnan(self["Flux"])) & (self["Flux"] > 0)
+        # NaN fluxes (non-calibrators) fail the comparison as well
+        is_cal = np.asarray(self["Flux"]) > 0
         calibrators = list(set(self["Source"][is_cal]))
         for cal in calibrators:
             self.calculate_src_flux(channel=channel, source=cal)
@@ -988,19 +1277,20 @@ class CalibratorTable(Table):
 
         Checks for invalid (nan and such) values.
         """
-        goodch = np.ones(len(self), dtype=bool)
+        # Select on plain arrays, without copying the whole table
+        allwidths = np.asarray(self["Width"], dtype=float)
+        allwidth_errs = np.asarray(self["Width Err"], dtype=float)
+        # NaN values fail the comparison as well
+        good = allwidth_errs > 0
         if channel is not None:
-            goodch = self["Chan"] == channel
-        allwidths = self[goodch]["Width"]
-        allwidth_errs = self[goodch]["Width Err"]
-        good = (allwidth_errs > 0) & (allwidth_errs == allwidth_errs)
+            good &= np.asarray(self["Chan"] == channel)
         allwidths = allwidths[good]
         allwidth_errs = allwidth_errs[good]
 
         # Weighted mean
         width = np.sum(allwidths / allwidth_errs) / np.sum(1 / allwidth_errs)
 
-        width_err = np.sqrt(np.sum(allwidth_errs ** 2))
+        width_err = np.linalg.norm(allwidth_errs)
         return np.radians(width), np.radians(width_err)
 
     def counts_over_Jy(self, channel=None, elevation=None):
@@ -1031,7 +1321,7 @@ class CalibratorTable(Table):
             ax = plt.gca()
             showit = True
 
-        good = (self[xcol] == self[xcol]) & (self[ycol] == self[ycol])
+        good = ~(np.isnan(self[xcol]) | np.isnan(self[ycol]))
         mask = np.ones_like(good)
         label = ""
         if channel is not None:
@@ -1073,21 +1363,24 @@ class CalibratorTable(Table):
     def show(self):
         """Show a summary of the calibration."""
 
-        from matplotlib import cm
-
         # TODO: this is meant to become interactive. I will make different
         # panels linked to each other.
 
         fig = plt.figure("Summary", figsize=(16, 16))
-        plt.suptitle("Summary")
+        fig.suptitle("Summary")
         gs = GridSpec(2, 2, hspace=0)
-        ax00 = plt.subplot(gs[0, 0])
-        ax01 = plt.subplot(gs[0, 1], sharey=ax00)
-        ax10 = plt.subplot(gs[1, 0], sharex=ax00)
-        ax11 = plt.subplot(gs[1, 1], sharex=ax01, sharey=ax10)
+        ax00 = fig.add_subplot(gs[0, 0])
+        ax01 = fig.add_subplot(gs[0, 1], sharey=ax00)
+        ax10 = fig.add_subplot(gs[1, 0], sharex=ax00)
+        ax11 = fig.add_subplot(gs[1, 1], sharex=ax01, sharey=ax10)
 
         channels = list(set(self["Chan"]))
         colors = cm.rainbow(np.linspace(0, 1, len(channels)))
+        # The conversion function is linear in elevation: a coarse grid,
+        # shared by all channels, draws it just as well as a fine one
+        elevations = np.linspace(
+            np.min(self["Elevation"]), np.max(self["Elevation"]), 100
+        )
         for ic, channel in enumerate(channels):
             # Ugly workaround for python 2-3 compatibility
             channel_str = channel
@@ -1102,9 +1395,6 @@ class CalibratorTable(Table):
                 color=color,
             )
 
-            elevations = np.arange(
-                np.min(self["Elevation"]), np.max(self["Elevation"]), 0.001
-            )
             jy_over_cts, jy_over_cts_err = self.Jy_over_counts(
                 channel_str, np.radians(elevations)
             )
@@ -1160,11 +1450,17 @@ class CalibratorTable(Table):
                 color=color,
             )
 
-        for i in np.arange(-1, 1, 0.1):
-            # Arcmin errors
-            ax10.axhline(i, ls="--", color="gray")
-            ax11.axhline(i, ls="--", color="gray")
-        #            ax11.text(1, i, "{}".format())
+        # Arcmin errors. A single collection of lines per panel, spanning
+        # the full width of the axes like axhline
+        for ax in [ax10, ax11]:
+            ax.hlines(
+                np.arange(-1, 1, 0.1),
+                0,
+                1,
+                transform=ax.get_yaxis_transform(),
+                ls="--",
+                color="gray",
+            )
         ax00.legend()
         ax01.legend()
         ax10.legend()
@@ -1173,7 +1469,7 @@ class CalibratorTable(Table):
         ax11.set_xlabel("Azimuth")
         ax00.set_ylabel("Flux / Counts")
         ax10.set_ylabel("Pointing error (arcmin)")
-        plt.savefig("calibration_summary.png")
+        fig.savefig("calibration_summary.png")
         plt.close(fig)
 
 
@@ -1191,52 +1487,105 @@ def flux_function(start_frequency, bandwidth, coeffs, ecoeffs):
     ecoeffs : list of floats
         Uncertainties of the PB13 interpolation
     """
-    a0, a1, a2, a3 = coeffs
+    coeffs = np.asarray(coeffs)
+    ecoeffs = np.asarray(ecoeffs)
 
     if np.all(ecoeffs < 1e10):
         # assume 5% error on calibration parameters!
         ecoeffs = coeffs * 0.05
-    a0e, a1e, a2e, a3e = ecoeffs
-    f0 = start_frequency
-    f1 = start_frequency + bandwidth
 
-    fs = np.linspace(f0, f1, 21)
-    df = np.diff(fs)[0]
-    fmean = (fs[:-1] + fs[1:]) / 2
+    # 0-d arrays cannot be used as keys of the cache
+    logf, df = _log_frequency_grid(float(start_frequency), float(bandwidth))
 
-    logf = np.log10(fmean)
-    logS = a0 + a1 * logf + a2 * logf ** 2 + a3 * logf ** 3
-    elogS = a0e + a1e * logf + a2e * logf ** 2 + a3e * logf ** 3
-
-    S = 10 ** logS
-    eS = S * elogS
+    # np.polyval wants the highest-order coefficient first
+    S = 10 ** np.polyval(coeffs[::-1], logf)
+    eS = S * np.polyval(ecoeffs[::-1], logf)
 
     # Error is not random, should add linearly; divide by bandwidth
     return np.sum(S) * df / bandwidth, np.sum(eS) * df / bandwidth
 
 
+@functools.lru_cache(maxsize=128)
+def _log_frequency_grid(start_frequency, bandwidth):
+    """Log10 of the central frequencies of 20 bins in the band, and bin width.
+
+    The same frequency setup is used in many scans: calculate only once.
+    The returned array is shared, and must not be modified.
+    """
+    fs = np.linspace(start_frequency, start_frequency + bandwidth, 21)
+    df = np.diff(fs)[0]
+    fmean = (fs[:-1] + fs[1:]) / 2
+
+    return np.log10(fmean), df
+
+
 def _calc_flux_from_coeffs(conf, frequency, bandwidth=1, time=0):
     """Return the flux of a calibrator at a given frequency.
 
     Uses Perley & Butler ApJS 204, 19 (2013).
     """
-    import io
-
     coefftable = conf["CoeffTable"]["coeffs"]
-    fobj = io.BytesIO(standard_byte(coefftable))
-    table = Table.read(fobj, format="ascii.csv")
+    times, _, _ = _read_coeff_table(coefftable)
+
+    idx = _closest_index(times, time)
+
+    return _cached_flux_from_coeffs(
+        coefftable, idx, float(frequency), float(bandwidth)
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_flux_from_coeffs(coefftable, idx, frequency, bandwidth):
+    """Flux from row ``idx`` of a coefficient table, calculated only once.
+
+    The time of the observation only selects the row of the table, so many
+    scans with the same frequency setup share the same result.
+    """
+    _, all_coeffs, all_ecoeffs = _read_coeff_table(coefftable)
+    return flux_function(
+        frequency, bandwidth, all_coeffs[idx], all_ecoeffs[idx]
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _read_coeff_table(coefftable):
+    """Parse a table of flux coefficients, only once for each calibrator.
 
-    idx = np.argmin(np.abs(np.longdouble(table["time"]) - time))
+    Returns the times, and the coefficients and their errors as arrays of
+    shape ``(len(times), 4)``, all sorted by time.
 
-    a0, a0e = table["a0", "a0e"][idx]
-    a1, a1e = table["a1", "a1e"][idx]
-    a2, a2e = table["a2", "a2e"][idx]
-    a3, a3e = table["a3", "a3e"][idx]
-    coeffs = np.array([a0, a1, a2, a3], dtype=float)
+    Examples
+    --------
+    >>> header = "time, a0, a0e, a1, a1e, a2, a2e, a3, a3e"
+    >>> row = "2010.0,1,0.1,2,0.2,3,0.3,4,0.4"
+    >>> times, coeffs, ecoeffs = _read_coeff_table(header + os.linesep + row)
+    >>> np.allclose(coeffs, [[1, 2, 3, 4]])
+    True
+    >>> np.allclose(ecoeffs, [[0.1, 0.2, 0.3, 0.4]])
+    True
+    >>> row2 = "2000.0,5,0.5,6,0.6,7,0.7,8,0.8"
+    >>> table = os.linesep.join([header, row, row2])
+    >>> times, coeffs, ecoeffs = _read_coeff_table(table)
+    >>> np.allclose(times, [2000, 2010])
+    True
+    >>> np.allclose(coeffs[:, 0], [5, 1])
+    True
+    """
+    import io
 
-    ecoeffs = np.array([a0e, a1e, a2e, a3e], dtype=float)
+    fobj = io.BytesIO(standard_byte(coefftable))
+    table = Table.read(fobj, format="ascii.csv")
 
-    return flux_function(frequency, bandwidth, coeffs, ecoeffs)
+    times = np.array(table["time"], dtype=float)
+    coeffs = np.array(
+        [table[col] for col in ["a0", "a1", "a2", "a3"]], dtype=float
+    ).T
+    ecoeffs = np.array(
+        [table[col] for col in ["a0e", "a1e", "a2e", "a3e"]], dtype=float
+    ).T
+    # Sorted by time, so that the closest epoch is found by bisection
+    order = np.argsort(times, kind="stable")
+    return times[order], coeffs[order], ecoeffs[order]
 
 
 def main_cal(args=None):
@@ -1318,6 +1667,15 @@ def main_cal(args=None):
         help="Check consistency of calibration",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel processes used to fit the scans "
+        "(default: 1)",
+    )
+
     args = parser.parse_args(args)
 
     if args.sample_config:
@@ -1349,7 +1707,12 @@ def main_cal(args=None):
     if not os.path.exists(outfile_unfilt):
         caltable = CalibratorTable()
         caltable.from_scans(
-            scan_list, freqsplat=args.splat, nofilt=args.nofilt, plot=args.show
+            scan_list,
+            freqsplat=args.splat,
+            nofilt=args.nofilt,
+            plot=args.show,
+            config_file=args.config,
+            max_workers=args.jobs,
         )
         caltable.write(outfile_unfilt)
     else:
@@ -1472,11 +1835,21 @@ def main_lcurve(args=None):
 
     for s in sources:
         caltable.calculate_src_flux(source=s)
-        good = caltable["Source"] == s
+
+    # Split the table by source once, instead of masking it for each source
+    lc_columns = ["Time", "Calculated Flux", "Calculated Flux Err", "Chan"]
+    lc_data = Table(caltable, copy=False)[["Source"] + lc_columns]
+    by_source = lc_data.group_by("Source")
+    groups = dict(zip(by_source.groups.keys["Source"], by_source.groups))
+    for s in sources:
+        group = groups.get(s)
+        if group is None:
+            # Still write the light curve, with no rows
+            log.warning(f"No data for source {s}")
+            group = lc_data[:0]
         lctable = Table()
-        lctable.add_column(Column(name="Time", dtype=float))
-        lctable["Time"] = caltable["Time"][good]
-        lctable["Flux"] = caltable["Calculated Flux"][good]
-        lctable["Flux Err"] = caltable["Calculated Flux Err"][good]
-        lctable["Chan"] = caltable["Chan"][good]
+        lctable["Time"] = np.asarray(group["Time"], dtype=float)
+        lctable["Flux"] = group["Calculated Flux"]
+        lctable["Flux Err"] = group["Calculated Flux Err"]
+        lctable["Chan"] = group["Chan"]
         lctable.write(s.replace(" ", "_") + ".csv", overwrite=True)
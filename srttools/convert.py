@@ -1,108 +1,219 @@
 from astropy.io import fits
 import astropy.units as u
 from astropy.time import Time
-from astropy.table import Table
 import numpy as np
-import copy
 import warnings
 import os
-import glob
 import shutil
+import collections
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from astropy.utils.exceptions import AstropyWarning
+from astropy import log
 
 from .io import get_coords_from_altaz_offset, correct_offsets
-from .io import get_rest_angle, observing_angle, locations
+from .io import get_rest_angle, _observing_angle_rad, locations
+from .io import _MIN_OFFSET_RAD
+from .io import read_data_fitszilla
 from .converters.mbfits import MBFITS_creator
 from .converters.classfits import CLASSFITS_creator
 from .converters.sdfits import SDFITS_creator
 
+# Single precision is enough for the pointing in el and az (better than
+# 0.1 arcsec); ra and dec are kept in double precision.
+_COORD_DTYPE = np.dtype(
+    [("raj2000", "f8"), ("decj2000", "f8"), ("el", "f4"), ("az", "f4")]
+)
 
-def convert_to_complete_fitszilla(fname, outname):
+
+def convert_to_complete_fitszilla(fname, outname, max_workers=1):
     if outname == fname:
         raise ValueError("Files cannot have the same name")
-    with fits.open(fname, memmap=False) as lchdulist:
-        _convert_to_complete_fitszilla(lchdulist, outname)
-        lchdulist.writeto(outname + ".fits", overwrite=True)
+    _convert_to_complete_fitszilla(
+        fname, outname + ".fits", max_workers=max_workers
+    )
 
 
-def _convert_to_complete_fitszilla(lchdulist, outname):
+def _convert_feed_batch(
+    feeds, xoffsets, yoffsets, obs_angles, obstimes, el_save, az_save, site
+):
+    """Calculate the sky coordinates observed by a group of feeds.
 
-    feed_input_data = lchdulist["FEED TABLE"].data
-    xoffsets = feed_input_data["xOffset"] * u.rad
-    yoffsets = feed_input_data["yOffset"] * u.rad
-    # ----------- Extract generic observation information ------------------
-    site = lchdulist[0].header["ANTENNA"].lower()
+    All angles are in radians. ``xoffsets`` and ``yoffsets`` contain one
+    value per feed, ``obs_angles`` has shape ``(n_feeds, n_times)``. Returns
+    the feed indices together with the ``ra``, ``dec``, ``el`` and ``az``
+    arrays, all with shape ``(n_feeds, n_times)``.
+    """
     location = locations[site]
+    # A single working buffer for each coordinate, shared by all feeds
+    el = np.empty((len(feeds), el_save.size))
+    az = np.empty((len(feeds), az_save.size))
+    np.copyto(el, el_save)
+    np.copyto(az, az_save)
+    xoffs, yoffs = correct_offsets(
+        obs_angles, xoffsets[:, np.newaxis], yoffsets[:, np.newaxis]
+    )
 
-    rest_angles = get_rest_angle(xoffsets, yoffsets)
+    # el and az are also changed inside this function (inplace is True)
+    ra, dec = get_coords_from_altaz_offset(
+        obstimes, el, az, xoffs, yoffs, location=location, inplace=True
+    )
+    return feeds, ra.to_value(u.rad), dec.to_value(u.rad), el, az
+
+
+def _convert_feeds(batch_args, max_workers):
+    """Yield the results of ``_convert_feed_batch``, in the input order."""
+    # Feeds are independent: distribute them over multiple processes
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(_convert_feed_batch, *zip(*batch_args))
+    else:
+        for args in batch_args:
+            yield _convert_feed_batch(*args)
+
+
+def _convert_to_complete_fitszilla(fname, outfile, max_workers=1):
+    with fits.open(fname, memmap=True, mode="denywrite") as lchdulist:
+        feed_input_data = lchdulist["FEED TABLE"].data
+        xoff_arr = np.array(feed_input_data["xOffset"], dtype=np.float64)
+        yoff_arr = np.array(feed_input_data["yOffset"], dtype=np.float64)
+        # ----------- Extract generic observation information --------------
+        site = lchdulist[0].header["ANTENNA"].lower()
+
+        # Only read the columns that are needed, without copying the whole
+        # data table (ra and dec are recalculated from el and az)
+        datahdu = lchdulist["DATA TABLE"]
+        data_table_data = datahdu.data
+
+        el_save = np.ascontiguousarray(data_table_data["el"], dtype=np.float64)
+        az_save = np.ascontiguousarray(data_table_data["az"], dtype=np.float64)
+        derot_angle = np.ascontiguousarray(
+            data_table_data["derot_angle"], dtype=np.float64
+        )
+        times = np.ascontiguousarray(data_table_data["time"], dtype=np.float64)
 
-    datahdu = lchdulist["DATA TABLE"]
-    data_table_data = Table(datahdu.data)
+    # All angles are in radians. Avoid Quantities in the per-feed operations
+    rest_angles = u.Quantity(get_rest_angle(xoff_arr, yoff_arr), u.rad).value
 
-    new_table = Table()
-    info_to_retrieve = [
-        "time",
-        "derot_angle",
-        "el",
-        "az",
-        "raj2000",
-        "decj2000",
+    # offsets < 0.001 arcseconds: don't correct (usually feed 0)
+    active = (np.abs(xoff_arr) >= _MIN_OFFSET_RAD) | (
+        np.abs(yoff_arr) >= _MIN_OFFSET_RAD
+    )
+
+    # These do not depend on the feed: calculate them once.
+    obstimes = Time(times * u.day, format="mjd", scale="utc")
+    obs_angles = _observing_angle_rad(
+        rest_angles[:, np.newaxis], derot_angle[np.newaxis, :]
+    )
+
+    active_feeds = np.nonzero(active)[0]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(min(max_workers, active_feeds.size), 1)
+
+    # Convert all feeds in a single vectorized batch, or in one batch per
+    # process if more processes are used.
+    batch_args = [
+        (
+            feeds,
+            xoff_arr[feeds],
+            yoff_arr[feeds],
+            obs_angles[feeds],
+            obstimes,
+            el_save,
+            az_save,
+            site,
+        )
+        for feeds in np.array_split(active_feeds, max_workers)
+        if feeds.size > 0
     ]
-    for info in info_to_retrieve:
-        new_table[info.replace("j2000", "")] = data_table_data[info]
-
-    el_save = new_table["el"]
-    az_save = new_table["az"]
-    derot_angle = new_table["derot_angle"]
-    el_save.unit = u.rad
-    az_save.unit = u.rad
-    derot_angle.unit = u.rad
-    times = new_table["time"]
-
-    for i, (xoffset, yoffset) in enumerate(zip(xoffsets, yoffsets)):
-        obs_angle = observing_angle(rest_angles[i], derot_angle)
-
-        # offsets < 0.001 arcseconds: don't correct (usually feed 0)
-        if (
-            np.abs(xoffset) < np.radians(0.001 / 60.0) * u.rad
-            and np.abs(yoffset) < np.radians(0.001 / 60.0) * u.rad
+
+    # The original HDUs are not modified: copy the input file and append
+    # the new extensions to it, as soon as they are ready. Work on a
+    # temporary file and only move it to the final name when complete.
+    tmpfile = outfile + ".tmp." + str(os.getpid())
+    shutil.copyfile(fname, tmpfile)
+    # The table is written to disk right away: reuse the same buffer for
+    # all feeds
+    coords = np.empty(times.size, dtype=_COORD_DTYPE)
+    try:
+        for feeds, ras, decs, els, azs in _convert_feeds(
+            batch_args, max_workers
         ):
-            continue
-        el = copy.deepcopy(el_save)
-        az = copy.deepcopy(az_save)
-        xoffs, yoffs = correct_offsets(obs_angle, xoffset, yoffset)
-        obstimes = Time(times * u.day, format="mjd", scale="utc")
-
-        # el and az are also changed inside this function (inplace is True)
-        ra, dec = get_coords_from_altaz_offset(
-            obstimes, el, az, xoffs, yoffs, location=location, inplace=True
-        )
-        ra = fits.Column(array=ra, name="raj2000", format="1D")
-        dec = fits.Column(array=dec, name="decj2000", format="1D")
-        el = fits.Column(array=el, name="el", format="1D")
-        az = fits.Column(array=az, name="az", format="1D")
-        new_data_extension = fits.BinTableHDU.from_columns([ra, dec, el, az])
-        new_data_extension.name = "Coord{}".format(i)
-        lchdulist.append(new_data_extension)
+            for i, ra, dec, el, az in zip(feeds, ras, decs, els, azs):
+                coords["raj2000"] = ra
+                coords["decj2000"] = dec
+                coords["el"] = el
+                coords["az"] = az
+                new_data_extension = fits.BinTableHDU(
+                    data=coords, name="Coord{}".format(i)
+                )
+                fits.append(
+                    tmpfile,
+                    new_data_extension.data,
+                    header=new_data_extension.header,
+                )
+    except BaseException:
+        os.unlink(tmpfile)
+        raise
+    os.replace(tmpfile, outfile)
 
 
-def launch_convert_coords(name, label, save_locally=False):
-    allfiles = []
+def _list_subscan_files(dirname):
+    """List the FITS files in a directory, except ``summary.fits``.
+
+    Like ``glob``, hidden files are ignored. The list is sorted by file name.
+    """
+    with os.scandir(dirname) as it:
+        files = [
+            entry.path
+            for entry in it
+            if entry.name.endswith(".fits")
+            and not entry.name.startswith(".")
+            and entry.name != "summary.fits"
+            and entry.is_file()
+        ]
+    return sorted(files)
+
+
+def launch_convert_coords(name, label, save_locally=False, max_workers=1):
     if os.path.isdir(name):
-        allfiles += glob.glob(os.path.join(name, "*.fits"))
+        allfiles = _list_subscan_files(name)
     else:
-        allfiles += [name]
+        allfiles = [name]
 
+    fnames = []
+    outroots = []
     for fname in allfiles:
-        if "summary.fits" in fname:
-            continue
         outroot = fname.replace(".fits", "_" + label)
         if save_locally:
             outroot = os.path.basename(outroot)
-
-        convert_to_complete_fitszilla(fname, outroot)
-    return outroot
+        fnames.append(fname)
+        outroots.append(outroot)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    file_workers = min(max_workers, len(fnames))
+
+    # Files are independent: distribute them over multiple processes, and
+    # convert the feeds of each file serially to avoid nested process pools
+    if file_workers > 1:
+        with ProcessPoolExecutor(max_workers=file_workers) as executor:
+            list(
+                executor.map(
+                    convert_to_complete_fitszilla,
+                    fnames,
+                    outroots,
+                    [1] * len(fnames),
+                )
+            )
+    else:
+        for fname, outroot in zip(fnames, outroots):
+            convert_to_complete_fitszilla(
+                fname, outroot, max_workers=max_workers
+            )
+    return outroots[-1]
 
 
 # from memory_profiler import profile
@@ -111,7 +222,13 @@ def launch_convert_coords(name, label, save_locally=False):
 #
 # @profile(precision=precision, stream=fp)
 def launch_mbfits_creator(
-    name, label, test=False, wrap=False, detrend=False, save_locally=False
+    name,
+    label,
+    test=False,
+    wrap=False,
+    detrend=False,
+    save_locally=False,
+    max_workers=None,
 ):
     if not os.path.isdir(name):
         raise ValueError("Input for MBFITS conversion must be a directory.")
@@ -122,10 +239,30 @@ def launch_mbfits_creator(
     if os.path.exists(summary):
         mbfits.fill_in_summary(summary)
 
-    for fname in sorted(glob.glob(os.path.join(name, "*.fits"))):
-        if "summary.fits" in fname:
-            continue
-        mbfits.add_subscan(fname, detrend=detrend)
+    subscan_files = _list_subscan_files(name)
+
+    # Reading the subscans is independent for each file and mostly I/O and
+    # NumPy: do it in a pool of threads, while the MBFITS structure, which
+    # is shared, is updated serially in the original order. At most
+    # max_workers tables are read ahead, to bound the memory usage.
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(max_workers, 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        files_to_read = iter(subscan_files)
+        pending = collections.deque(
+            executor.submit(read_data_fitszilla, fname)
+            for fname in itertools.islice(files_to_read, max_workers)
+        )
+        for fname in subscan_files:
+            subscan = pending.popleft().result()
+            next_fname = next(files_to_read, None)
+            if next_fname is not None:
+                pending.append(
+                    executor.submit(read_data_fitszilla, next_fname)
+                )
+            log.info("Loaded {}".format(fname))
+            mbfits.add_subscan(subscan, detrend=detrend)
 
     mbfits.update_scan_info()
     if save_locally:
@@ -195,6 +332,9 @@ def match_srt_name(name):
     return name_re.match(name)
 
 
+_KNOWN_FORMATS = ("fitsmod", "mbfits", "mbfitsw", "classfits", "sdfits")
+
+
 def main_convert(args=None):
     import argparse
 
@@ -242,6 +382,15 @@ def main_convert(args=None):
         default=False,
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Maximum number of parallel processes used for the conversion "
+        "(default: 1)",
+    )
+
     parser.add_argument(
         "--save-locally",
         help="Save all data in the current directory, not"
@@ -253,10 +402,17 @@ def main_convert(args=None):
     args = parser.parse_args(args)
 
     outnames = []
+    if args.format not in _KNOWN_FORMATS:
+        warnings.warn("Unknown output format", AstropyWarning)
+        return outnames
+
     for fname in args.files:
         if args.format == "fitsmod":
             outname = launch_convert_coords(
-                fname, args.format, save_locally=args.save_locally
+                fname,
+                args.format,
+                save_locally=args.save_locally,
+                max_workers=args.jobs,
             )
             outnames.append(outname)
         elif args.format == "mbfits":
@@ -267,6 +423,7 @@ def main_convert(args=None):
                 wrap=False,
                 detrend=args.detrend,
                 save_locally=args.save_locally,
+                max_workers=args.jobs,
             )
 
             if args.test:
@@ -294,6 +451,7 @@ def main_convert(args=None):
                 wrap=True,
                 detrend=args.detrend,
                 save_locally=args.save_locally,
+                max_workers=args.jobs,
             )
             outnames.append(outname)
         elif args.format == "classfits":
@@ -312,6 +470,4 @@ def main_convert(args=None):
                 save_locally=args.save_locally,
             )
             outnames.append(outname)
-        else:
-            warnings.warn("Unknown output format", AstropyWarning)
     return outnames
@@ -1,8 +1,9 @@
 from astropy.io import fits
-from astropy.table import Table
+from astropy.table import Table, vstack
 from astropy.time import Time
 import astropy.units as u
 import os
+from types import SimpleNamespace
 import numpy as np
 from srttools.io import (
     mkdir_p,
@@ -11,14 +12,20 @@ from srttools.io import (
     get_chan_columns,
     classify_chan_columns,
 )
-from srttools.utils import scantype, force_move_file, minmax, median_diff
+from srttools.utils import scantype, minmax, median_diff
 from srttools.fit import detrend_spectroscopic_data
 import warnings
 from astropy import log
 
 
-def default_scan_info_table():
+def default_scan_info_table(rows=None):
+    """Table containing the information on each subscan.
+
+    ``rows``, if not empty, is a list of rows as returned by
+    ``get_subscan_info``.
+    """
     return Table(
+        rows=rows or None,
         names=[
             "scan_id",
             "start",
@@ -75,23 +82,30 @@ def default_scan_info_table():
 
 
 def get_subscan_info(subscan):
-    info = default_scan_info_table()
+    """Get the information on a subscan, as a row of the scan info table.
+
+    The values are in the same order as the columns of
+    ``default_scan_info_table``.
+    """
     scan_id = subscan.meta["SubScanID"]
     start, stop = minmax(subscan["time"])
-    ramin, ramax = minmax(subscan["ra"])
-    decmin, decmax = minmax(subscan["dec"])
-    azmin, azmax = minmax(subscan["az"])
-    elmin, elmax = minmax(subscan["el"])
     is_skydip = subscan.meta["is_skydip"]
 
-    d_ra = median_diff(subscan["ra"])
-    d_dec = median_diff(subscan["dec"])
-    d_az = median_diff(subscan["az"])
-    d_el = median_diff(subscan["el"])
+    # One row per coordinate, with all the samples of all feeds
+    coords = np.array(
+        [subscan[col] for col in ["ra", "dec", "az", "el"]], dtype=float
+    ).reshape(4, -1)
+    ramin, decmin, azmin, elmin = coords.min(axis=1)
+    ramax, decmax, azmax, elmax = coords.max(axis=1)
 
-    ravar = (ramax - ramin) * np.cos(np.mean((decmin, decmax)))
+    if np.any(np.isnan(coords)):
+        d_ra, d_dec, d_az, d_el = [median_diff(c) for c in coords]
+    else:
+        d_ra, d_dec, d_az, d_el = np.median(np.diff(coords, axis=1), axis=1)
+
+    ravar = (ramax - ramin) * np.cos(0.5 * (decmin + decmax))
     decvar = decmax - decmin
-    azvar = (azmax - azmin) * np.cos(np.mean((elmin, elmax)))
+    azvar = (azmax - azmin) * np.cos(0.5 * (elmin + elmax))
     elvar = elmax - elmin
 
     tot_eq = np.sqrt(ravar ** 2 + decvar ** 2)
@@ -99,47 +113,47 @@ def get_subscan_info(subscan):
     ravar /= tot_eq
     decvar /= tot_hor
 
-    directions = np.array(["ra", "dec", "az", "el"])
-    allvars = np.array([ravar, decvar, azvar, elvar])
-
     if tot_eq > 2 * tot_hor:
         kind = "point"
         direction = ""
     else:
         kind = "line"
-        direction = directions[np.argmax(allvars)]
-
-    info.add_row(
-        [
-            scan_id,
-            start,
-            stop,
-            ramin,
-            ramax,
-            d_ra,
-            decmin,
-            decmax,
-            d_dec,
-            azmin,
-            azmax,
-            d_az,
-            elmin,
-            elmax,
-            d_el,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            is_skydip,
-            kind,
-            direction,
+        # Like np.argmax, the first of equal maxima wins
+        allvars = [
+            (ravar, "ra"),
+            (decvar, "dec"),
+            (azvar, "az"),
+            (elvar, "el"),
         ]
+        direction = max(allvars, key=lambda var: var[0])[1]
+
+    return (
+        scan_id,
+        start,
+        stop,
+        ramin,
+        ramax,
+        d_ra,
+        decmin,
+        decmax,
+        d_dec,
+        azmin,
+        azmax,
+        d_az,
+        elmin,
+        elmax,
+        d_el,
+        0,
+        0,
+        0,
+        0,
+        0,
+        0,
+        is_skydip,
+        kind,
+        direction,
     )
 
-    return info
-
 
 def format_direction(direction):
     """
@@ -236,32 +250,64 @@ def get_observing_strategy_from_subscan_info(info):
         mode = "RASTER"
         geom = "SINGLE"
 
-    results = type("results", (), {})()
-    results.mode = mode
-    results.geom = geom
-    results.sep = (xspc, yspc)
-    results.zigzag = zigzag
-    results.length = length
-    results.type = stype
-    results.ctype = ctype
-    results.stype = stype
-    results.scanvel = length / np.median(durations)
-    results.direction = direction
-    results.nobs = len(info["scan_id"])
-    results.scantime = np.median(durations)
-    return results
-
-
-def _copy_hdu_and_adapt_length(hdu, length):
+    scantime = np.median(durations)
+    return SimpleNamespace(
+        mode=mode,
+        geom=geom,
+        sep=(xspc, yspc),
+        zigzag=zigzag,
+        length=length,
+        type=stype,
+        ctype=ctype,
+        stype=stype,
+        scanvel=length / scantime,
+        direction=direction,
+        nobs=len(info["scan_id"]),
+        scantime=scantime,
+    )
+
+
+def _fill_template_hdu(hdu, length, new_columns):
+    """Resize a template table HDU and replace some of its columns, in place.
+
+    The new columns, given as a dictionary of arrays or Quantities with
+    ``length`` rows, can have a different shape (e.g. one value per feed)
+    than the ones they replace. All other columns repeat the values in the
+    first row of the template.
+
+    Examples
+    --------
+    >>> hdu = fits.BinTableHDU.from_columns(
+    ...     [fits.Column(name="a", format="D", array=[0]),
+    ...      fits.Column(name="b", format="J", array=[1])])
+    >>> _fill_template_hdu(hdu, 2, {"a": [[1, 2], [3, 4]] * u.deg})
+    >>> hdu.data["a"].shape, hdu.columns["a"].unit
+    ((2, 2), 'deg')
+    >>> list(hdu.data["b"])
+    [1, 1]
+    """
     data = hdu.data
-    columns = []
-    for col in data.columns:
-        newvals = [data[col.name][0]] * length
-        newcol = fits.Column(name=col.name, array=newvals, format=col.format)
-        columns.append(newcol)
-    newhdu = fits.BinTableHDU.from_columns(columns)
-    newhdu.header = hdu.header
-    return newhdu
+    values, units = {}, {}
+    for name, value in new_columns.items():
+        units[name] = getattr(value, "unit", None)
+        values[name] = np.asarray(getattr(value, "value", value))
+
+    dtype = []
+    for name in data.names:
+        if name in values:
+            dtype.append((name, values[name].dtype, values[name].shape[1:]))
+        else:
+            dtype.append((name, data.dtype[name]))
+
+    newdata = np.empty(length, dtype=dtype)
+    for name in data.names:
+        newdata[name] = values[name] if name in values else data[name][0]
+
+    newhdu = fits.BinTableHDU.from_columns(newdata)
+    for name, unit in units.items():
+        if unit is not None:
+            newhdu.columns[name].unit = unit.to_string()
+    hdu.data = newhdu.data
 
 
 keywords_to_reset = [
@@ -438,11 +484,16 @@ keywords_to_reset = [
     "WOBTHROW",
     "WOBUSED",
 ]
+_KEYWORDS_TO_RESET = frozenset(keywords_to_reset)
+_COMMENTARY_KEYWORDS = ("COMMENT", "HISTORY", "")
 
 
-def pack_data(scan, polar_dict, detrend=False):
+def pack_data(scan, polar_dict, detrend=False, out=None):
     """Pack data into MBFITS-ready format
 
+    If ``out`` is an array with the right shape and dtype, it is filled and
+    returned instead of allocating a new array.
+
     Examples
     --------
     >>> scan = {'Feed0_LCP': np.arange(4), 'Feed0_RCP': np.arange(4, 8)}
@@ -463,6 +514,9 @@ def pack_data(scan, polar_dict, detrend=False):
     >>> np.allclose(res, [[[ 1.,  1.,  1.,  1.], [ 0.,  0.,  0.,  0.]],
     ...                   [[ 1.,  1.,  1.,  1.], [ 0.,  0.,  0.,  0.]]])
     True
+    >>> res2 = pack_data(scan, polar, out=res)
+    >>> res2 is res
+    True
     """
 
     polar_list = list(polar_dict.keys())
@@ -482,7 +536,47 @@ def pack_data(scan, polar_dict, detrend=False):
             detr, _ = detrend_spectroscopic_data(0, d, "als")
             new_data.append(detr)
         data = new_data
-    return np.stack(data, axis=1)
+
+    # Same as np.stack(data, axis=1), but possibly reusing the output array
+    shape = (len(data[0]), len(data)) + np.shape(data[0])[1:]
+    dtype = np.result_type(*data)
+    if out is None or out.shape != shape or out.dtype != dtype:
+        out = np.empty(shape, dtype=dtype)
+    for i, d in enumerate(data):
+        out[:, i] = d
+    return out
+
+
+def copy_matching_keywords(header, target, skip=()):
+    """Update the keywords of ``target`` that are also in ``header``.
+
+    Keywords starting with one of the prefixes in ``skip`` are ignored.
+    Repeated commentary keywords only contribute their last value, once.
+
+    Examples
+    --------
+    >>> from astropy.io.fits import Header
+    >>> h = Header({'SCANNUM': 5, 'NAXIS1': 3, 'a': 'blabla'})
+    >>> h['COMMENT'] = 'first'
+    >>> h['COMMENT'] = 'last'
+    >>> t = Header({'SCANNUM': 0, 'NAXIS1': 0, 'COMMENT': 'template'})
+    >>> t = copy_matching_keywords(h, t, skip=['NAXIS'])
+    >>> t['SCANNUM'], t['NAXIS1'], 'a' in t
+    (5, 0, False)
+    >>> list(t['COMMENT'])
+    ['template', 'last']
+    """
+    done = set()
+    for card in header.cards:
+        key = card.keyword
+        if key in done or key not in target or key.startswith(tuple(skip)):
+            continue
+        done.add(key)
+        if key in _COMMENTARY_KEYWORDS:
+            target[key] = header[key][-1]
+        else:
+            target[key] = card.value
+    return target
 
 
 def reset_all_keywords(header):
@@ -501,15 +595,30 @@ def reset_all_keywords(header):
     >>> h2['a']
     'blabla'
     """
-    for key in keywords_to_reset:
-        if key in header:
-            if isinstance(header[key], str):
+    for key in header.keys():
+        if key in _KEYWORDS_TO_RESET:
+            value = header[key]
+            if isinstance(value, str):
                 header[key] = ""
             else:
-                header[key] = type(header[key])(0)
+                header[key] = type(value)(0)
     return header
 
 
+def _load_fits(fname, nrows=None):
+    """Load all the HDUs of a FITS file in memory.
+
+    If ``nrows`` is not None, only the first ``nrows`` rows of tables are
+    kept.
+    """
+    with fits.open(fname, memmap=False) as hdul:
+        # Accessing the data loads them, before the file is closed
+        for hdu in hdul:
+            if hdu.data is not None and nrows is not None:
+                hdu.data = hdu.data[:nrows]
+        return fits.HDUList(list(hdul))
+
+
 class MBFITS_creator:
     def __init__(self, dirname, test=False):
         self.dirname = dirname
@@ -520,103 +629,109 @@ class MBFITS_creator:
         self.template_dir = os.path.join(datadir, "mbfits_template")
 
         self.FEBE = {}
+        self._templates = {}
 
+        # GROUPING and SCAN are kept in memory while they are filled, and
+        # only written to disk by _write_scan_files
         self.GROUPING = "GROUPING.fits"
-        with fits.open(
-            os.path.join(self.template_dir, "GROUPING.fits"), memmap=False
-        ) as grouping_template:
-            grouping_template[1].data = grouping_template[1].data[:1]
-
-            grouping_template.writeto(
-                os.path.join(self.dirname, self.GROUPING), overwrite=True
-            )
+        self._grouping = _load_fits(
+            os.path.join(self.template_dir, "GROUPING.fits"), nrows=1
+        )
+        self._grouping_rows = []
 
         self.SCAN = "SCAN.fits"
-        with fits.open(
-            os.path.join(self.template_dir, "SCAN.fits"), memmap=False
-        ) as scan_template:
-            scan_template[1].data["FEBE"][0] = "EMPTY"
+        self._scan = _load_fits(os.path.join(self.template_dir, "SCAN.fits"))
+        self._scan[1].data["FEBE"][0] = "EMPTY"
+        self._write_scan_files()
 
-            scan_template.writeto(
-                os.path.join(self.dirname, self.SCAN), overwrite=True
-            )
         self.date_obs = Time.now()
+        # Rows are collected here, and the scan info table is only built
+        # once, in update_scan_info
+        self._scan_rows = []
         self.scan_info = default_scan_info_table()
         self.nfeeds = None
         self.ra = 0
         self.dec = 0
         self.site = None
+        self._site_lon = None
         self.lst = 1e32
 
+    def _get_template(self, fname):
+        """Get a copy of a template file, that is only read from disk once.
+
+        ``fname`` is relative to the template directory. Only the first row
+        of the template tables is kept. The primary HDU (header only) is
+        never modified, and is shared by all copies.
+        """
+        if fname not in self._templates:
+            self._templates[fname] = _load_fits(
+                os.path.join(self.template_dir, fname), nrows=1
+            )
+        template = self._templates[fname]
+        copies = []
+        for hdu in template[1:]:
+            new_hdu = hdu.copy()
+            # HDU.copy resets the comments of the structural keywords
+            new_hdu.header = hdu.header.copy()
+            copies.append(new_hdu)
+        return fits.HDUList([template[0]] + copies)
+
     def fill_in_summary(self, summaryfile):
         log.info("Loading {}".format(summaryfile))
         with fits.open(summaryfile, memmap=False) as hdul:
             header = hdul[0].header
-            hdudict = dict(header.items())
 
-        self.ra = np.degrees(hdudict["RightAscension"])
-        self.dec = np.degrees(hdudict["Declination"])
+        self.ra = np.degrees(header["RightAscension"])
+        self.dec = np.degrees(header["Declination"])
         self.restfreq = None
-        if "RESTFREQ1" in hdudict:
-            self.resfreq = hdudict["RESTFREQ1"]
+        if "RESTFREQ1" in header:
+            self.resfreq = header["RESTFREQ1"]
 
         try:
-            self.date_obs = Time(hdudict["DATE-OBS"])
+            self.date_obs = Time(header["DATE-OBS"])
         except KeyError:
-            self.date_obs = Time(hdudict["DATE"])
+            self.date_obs = Time(header["DATE"])
         try:
-            self.obsid = int(hdudict["OBSID"])
+            self.obsid = int(header["OBSID"])
         except (KeyError, ValueError):
             self.obsid = 9999
 
-        with fits.open(
-            os.path.join(self.dirname, self.GROUPING), memmap=False
-        ) as grouphdul:
-            groupheader = grouphdul[0].header
-            groupdict = dict(groupheader.items())
-            for key in hdudict.keys():
-                if key in groupdict:
-                    groupheader[key] = hdudict[key]
-            groupheader["RA"] = self.ra
-            groupheader["DEC"] = self.dec
-            groupheader["DATE-OBS"] = self.date_obs.value
-            groupheader["MJD-OBS"] = self.date_obs.mjd
-            groupheader["SCANNUM"] = self.obsid
-            grouphdul.writeto("tmp.fits", overwrite=True)
-
-        force_move_file("tmp.fits", os.path.join(self.dirname, self.GROUPING))
-
-        with fits.open(
-            os.path.join(self.dirname, self.SCAN), memmap=False
-        ) as scanhdul:
-            scanheader = reset_all_keywords(scanhdul[1].header)
-            scandict = dict(scanheader.items())
-            for key in hdudict.keys():
-                if key[:5] in ["NAXIS", "PGCOU", "GCOUN"]:
-                    continue
-                if key in scandict:
-                    scanheader[key] = hdudict[key]
-            # Todo: update with correct keywords
-            scanheader["DATE-OBS"] = self.date_obs.value
-            scanheader["MJD"] = self.date_obs.mjd
-            scanheader["SCANNUM"] = self.obsid
-            scanhdul.writeto("tmp.fits", overwrite=True)
-
-        force_move_file("tmp.fits", os.path.join(self.dirname, self.SCAN))
+        groupheader = copy_matching_keywords(header, self._grouping[0].header)
+        groupheader["RA"] = self.ra
+        groupheader["DEC"] = self.dec
+        groupheader["DATE-OBS"] = self.date_obs.value
+        groupheader["MJD-OBS"] = self.date_obs.mjd
+        groupheader["SCANNUM"] = self.obsid
+
+        scanheader = copy_matching_keywords(
+            header,
+            reset_all_keywords(self._scan[1].header),
+            skip=["NAXIS", "PGCOU", "GCOUN"],
+        )
+        # Todo: update with correct keywords
+        scanheader["DATE-OBS"] = self.date_obs.value
+        scanheader["MJD"] = self.date_obs.mjd
+        scanheader["SCANNUM"] = self.obsid
 
     def add_subscan(self, scanfile, detrend=False):
-        log.info("Loading {}".format(scanfile))
-
-        subscan = read_data_fitszilla(scanfile)
-        subscan_info = get_subscan_info(subscan)
+        """Add a subscan to the MBFITS structure.
 
-        self.scan_info.add_row(subscan_info[0])
+        ``scanfile`` can be either the name of a fitszilla file or a table
+        already read with ``read_data_fitszilla``.
+        """
+        if isinstance(scanfile, Table):
+            subscan = scanfile
+        else:
+            log.info("Loading {}".format(scanfile))
+            subscan = read_data_fitszilla(scanfile)
+        self._scan_rows.append(get_subscan_info(subscan))
 
         time = Time(subscan["time"] * u.day, scale="utc", format="mjd")
         if self.date_obs.mjd > time[0].mjd:
             self.date_obs = time[0]
         if self.site is None:
             self.site = subscan.meta["site"]
+            self._site_lon = locations[self.site].lon
 
         chans = get_chan_columns(subscan)
 
@@ -625,75 +740,69 @@ class MBFITS_creator:
         if self.nfeeds is None:
             self.nfeeds = len(combinations.keys())
 
+        # The same for all feeds: calculate only once
+        lst = time.sidereal_time("apparent", self._site_lon).value
+        if lst[0] < self.lst:
+            self.lst = lst[0]
+        date_obs = time[0].fits.replace("(UTC)", "")
+        sample_rate = subscan["Feed0_LCP"].meta["sample_rate"]
+        ra_deg = subscan["ra"].to(u.deg)
+        dec_deg = subscan["dec"].to(u.deg)
+        az_deg = subscan["az"].to(u.deg)
+        el_deg = subscan["el"].to(u.deg)
+        coord_columns = {
+            "MJD": subscan["time"],
+            "RA": ra_deg,
+            "DEC": dec_deg,
+            "AZIMUTH": az_deg,
+            "ELEVATIO": el_deg,
+        }
+        _, direction = scantype(
+            subscan["ra"],
+            subscan["dec"],
+            el=subscan["el"],
+            az=subscan["az"],
+        )
+
+        direction_cut = direction.replace("<", "").replace(">", "").lower()
+        if direction_cut in ["ra", "dec"]:
+            baslon = ra_deg
+            baslat = dec_deg
+
+            yoff = baslat.value - self.dec
+            # GLS projection. The scaling factor is a scalar: apply it in
+            # place, without temporary arrays
+            xoff = baslon.value - self.ra
+            xoff *= np.cos(np.radians(self.dec))
+            coord_columns["LONGOFF"] = xoff
+            coord_columns["LATOFF"] = yoff
+        elif direction_cut in ["el", "az"]:
+            warnings.warn("AltAz projection not implemented properly")
+            baslon, baslat = az_deg, el_deg
+            coord_columns["LONGOFF"] = np.zeros(len(subscan))
+            coord_columns["LATOFF"] = np.zeros(len(subscan))
+        else:
+            raise ValueError("Unknown coordinates")
+
+        coord_columns["CBASLONG"] = baslon
+        coord_columns["CBASLAT"] = baslat
+        coord_columns["BASLONG"] = baslon
+        coord_columns["BASLAT"] = baslat
+
         for feed in combinations:
             felabel = subscan.meta["receiver"] + "{}".format(feed)
             febe = felabel + "-" + subscan.meta["backend"]
 
-            datapar = os.path.join(
-                self.template_dir, "1", "FLASH460L-XFFTS-DATAPAR.fits"
-            )
-            with fits.open(datapar, memmap=False) as subs_par_template:
+            datapar = os.path.join("1", "FLASH460L-XFFTS-DATAPAR.fits")
+            with self._get_template(datapar) as subs_par_template:
                 n = len(subscan)
                 # ------------- Update DATAPAR --------------
-                subs_par_template[1] = _copy_hdu_and_adapt_length(
-                    subs_par_template[1], n
-                )
-
-                newtable = Table(subs_par_template[1].data)
-                newtable["MJD"] = subscan["time"]
-                newtable["LST"][:] = time.sidereal_time(
-                    "apparent", locations[subscan.meta["site"]].lon
-                ).value
-                if newtable["LST"][0] < self.lst:
-                    self.lst = newtable["LST"][0]
-                newtable["INTEGTIM"][:] = subscan["Feed0_LCP"].meta[
-                    "sample_rate"
-                ]
-                newtable["RA"] = subscan["ra"].to(u.deg)
-                newtable["DEC"] = subscan["dec"].to(u.deg)
-                newtable["AZIMUTH"] = subscan["az"].to(u.deg)
-                newtable["ELEVATIO"] = subscan["el"].to(u.deg)
-                _, direction = scantype(
-                    subscan["ra"],
-                    subscan["dec"],
-                    el=subscan["el"],
-                    az=subscan["az"],
-                )
-
-                direction_cut = (
-                    direction.replace("<", "").replace(">", "").lower()
-                )
-                if direction_cut in ["ra", "dec"]:
-                    baslon = subscan["ra"].to(u.deg)
-                    baslat = subscan["dec"].to(u.deg)
-
-                    yoff = baslat.value - self.dec
-                    # GLS projection
-                    xoff = baslon.value - self.ra
-                    newtable["LONGOFF"] = xoff * np.cos(np.radians(self.dec))
-                    newtable["LATOFF"] = yoff
-                elif direction_cut in ["el", "az"]:
-                    warnings.warn("AltAz projection not implemented properly")
-                    baslon, baslat = (
-                        subscan["az"].to(u.deg),
-                        subscan["el"].to(u.deg),
-                    )
-                    newtable["LONGOFF"] = 0 * u.deg
-                    newtable["LATOFF"] = 0 * u.deg
-                else:
-                    raise ValueError("Unknown coordinates")
-
-                newtable["CBASLONG"] = baslon
-                newtable["CBASLAT"] = baslat
-                newtable["BASLONG"] = baslon
-                newtable["BASLAT"] = baslat
-
-                newhdu = fits.table_to_hdu(newtable)
-                subs_par_template[1].data = newhdu.data
-                subs_par_template[1].header["DATE-OBS"] = time[0].fits.replace(
-                    "(UTC)", ""
-                )
-                subs_par_template[1].header["LST"] = newtable["LST"][0]
+                _fill_template_hdu(subs_par_template[1], n, coord_columns)
+                datapar_data = subs_par_template[1].data
+                datapar_data["LST"] = lst
+                datapar_data["INTEGTIM"] = sample_rate
+                subs_par_template[1].header["DATE-OBS"] = date_obs
+                subs_par_template[1].header["LST"] = lst[0]
                 subs_par_template[1].header["FEBE"] = febe
                 subs_par_template[1].header["SCANDIR"] = format_direction(
                     direction_cut
@@ -703,31 +812,27 @@ class MBFITS_creator:
                 outdir = str(subscan.meta["SubScanID"])
                 mkdir_p(os.path.join(self.dirname, outdir))
                 new_datapar = os.path.join(outdir, febe + "-DATAPAR.fits")
-                subs_par_template.writeto("tmp.fits", overwrite=True)
-
-            force_move_file(
-                "tmp.fits", os.path.join(self.dirname, new_datapar)
-            )
+                subs_par_template.writeto(
+                    os.path.join(self.dirname, new_datapar), overwrite=True
+                )
 
-            arraydata = os.path.join(
-                self.template_dir, "1", "FLASH460L-XFFTS-ARRAYDATA-1.fits"
-            )
+            arraydata = os.path.join("1", "FLASH460L-XFFTS-ARRAYDATA-1.fits")
 
             new_arraydata_rows = []
+            packed_data = None
             bands = list(combinations[feed].keys())
             for baseband in combinations[feed]:
                 nbands = np.max(bands)
                 ch = list(combinations[feed][baseband].values())[0]
 
                 packed_data = pack_data(
-                    subscan, combinations[feed][baseband], detrend=detrend
+                    subscan,
+                    combinations[feed][baseband],
+                    detrend=detrend,
+                    out=packed_data,
                 )
                 # ------------- Update ARRAYDATA -------------
-                with fits.open(arraydata, memmap=False) as subs_template:
-                    subs_template[1] = _copy_hdu_and_adapt_length(
-                        subs_template[1], n
-                    )
-
+                with self._get_template(arraydata) as subs_template:
                     new_header = reset_all_keywords(subs_template[1].header)
 
                     new_header["SCANNUM"] = self.obsid
@@ -759,15 +864,17 @@ class MBFITS_creator:
                         new_header[i] = (new_header["CHANNELS"] + 1) // 2
 
                     subs_template[1].header = new_header
-                    newtable = Table(subs_template[1].data)
-                    newtable["MJD"] = subscan["time"]
-                    newtable["DATA"] = packed_data
-                    newhdu = fits.table_to_hdu(newtable)
-                    subs_template[1].data = newhdu.data
+                    _fill_template_hdu(
+                        subs_template[1],
+                        n,
+                        {"MJD": subscan["time"], "DATA": packed_data},
+                    )
 
                     subname = febe + "-ARRAYDATA-{}.fits".format(baseband)
                     new_sub = os.path.join(outdir, subname)
-                    subs_template.writeto("tmp.fits", overwrite=True)
+                    subs_template.writeto(
+                        os.path.join(self.dirname, new_sub), overwrite=True
+                    )
 
                     new_arraydata_rows.append(
                         [
@@ -781,64 +888,63 @@ class MBFITS_creator:
                         ]
                     )
 
-                force_move_file(
-                    "tmp.fits", os.path.join(self.dirname, new_sub)
+            # Finally, update GROUPING. The new rows are only added to the
+            # table when it is written
+            groupheader = self._grouping[0].header
+            if febe not in self.FEBE:
+                nfebe = len(list(self.FEBE.keys()))
+                new_febe = self.add_febe(
+                    febe, combinations, feed, subscan[ch].meta, bands=bands
                 )
 
-            # Finally, update GROUPING file
-            with fits.open(
-                os.path.join(self.dirname, self.GROUPING), memmap=False
-            ) as grouping:
-                newtable = Table(grouping[1].data)
-                if febe not in self.FEBE:
-
-                    nfebe = len(list(self.FEBE.keys()))
-                    new_febe = self.add_febe(
-                        febe, combinations, feed, subscan[ch].meta, bands=bands
-                    )
-
-                    grouping[0].header["FEBE{}".format(nfebe)] = febe
-                    grouping[0].header["FREQ{}".format(nfebe)] = (
-                        subscan[ch].meta["frequency"].to("Hz").value
-                    )
-                    grouping[0].header["BWID{}".format(nfebe)] = (
-                        subscan[ch].meta["bandwidth"].to("Hz").value
-                    )
-                    grouping[0].header["LINE{}".format(nfebe)] = ""
-
-                    newtable.add_row(
-                        [
-                            2,
-                            new_febe,
-                            "URL",
-                            "FEBEPAR-MBFITS",
-                            -999,
-                            febe,
-                            -999,
-                        ]
-                    )
-                    self.FEBE[febe] = new_febe
-
-                newtable.add_row(
-                    [2, new_datapar, "URL", "DATAPAR-MBFITS", -999, febe, -999]
+                groupheader["FEBE{}".format(nfebe)] = febe
+                groupheader["FREQ{}".format(nfebe)] = (
+                    subscan[ch].meta["frequency"].to("Hz").value
                 )
+                groupheader["BWID{}".format(nfebe)] = (
+                    subscan[ch].meta["bandwidth"].to("Hz").value
+                )
+                groupheader["LINE{}".format(nfebe)] = ""
 
-                for row in new_arraydata_rows:
-                    newtable.add_row(row)
-                new_hdu = fits.table_to_hdu(newtable)
-                grouping[1].data = new_hdu.data
-                grouping[0].header["INSTRUME"] = subscan[ch].meta["backend"]
-                grouping[0].header["TELESCOP"] = self.site
-
-                grouping.writeto("tmp.fits", overwrite=True)
+                self._grouping_rows.append(
+                    [2, new_febe, "URL", "FEBEPAR-MBFITS", -999, febe, -999]
+                )
+                self.FEBE[febe] = new_febe
 
-            force_move_file(
-                "tmp.fits", os.path.join(self.dirname, self.GROUPING)
+            self._grouping_rows.append(
+                [2, new_datapar, "URL", "DATAPAR-MBFITS", -999, febe, -999]
             )
+            self._grouping_rows.extend(new_arraydata_rows)
+            groupheader["INSTRUME"] = subscan[ch].meta["backend"]
+            groupheader["TELESCOP"] = self.site
 
             if self.test:
                 break
 
+    def _update_grouping_table(self):
+        """Add the rows collected in add_subscan to the GROUPING table."""
+        if not self._grouping_rows:
+            return
+        oldtable = Table(self._grouping[1].data)
+        newrows = Table(
+            rows=self._grouping_rows,
+            names=oldtable.colnames,
+            dtype=[oldtable[col].dtype for col in oldtable.colnames],
+        )
+        newtable = vstack([oldtable, newrows])
+        self._grouping[1].data = fits.table_to_hdu(newtable).data
+        self._grouping_rows = []
+
+    def _write_scan_files(self):
+        """Write the GROUPING and SCAN files to disk."""
+        self._update_grouping_table()
+        self._grouping.writeto(
+            os.path.join(self.dirname, self.GROUPING), overwrite=True
+        )
+        self._scan.writeto(
+            os.path.join(self.dirname, self.SCAN), overwrite=True
+        )
+
     def add_febe(self, febe, feed_info, feed, meta, bands=None):
         if bands is None:
             bands = [1]
@@ -889,113 +995,102 @@ class MBFITS_creator:
                 febe_template[1].header["FDTYPCOD"] = "1:L, 2:R, 3:Q, 4:U"
             else:
                 febe_template[1].header["FDTYPCOD"] = "1:L, 2:R"
-            febe_template.writeto("tmp.fits", overwrite=True)
-        force_move_file("tmp.fits", new_febe)
-
-        with fits.open(
-            os.path.join(self.dirname, self.SCAN), memmap=False
-        ) as scan:
-            newtable = Table(scan[1].data)
+            febe_template.writeto(new_febe, overwrite=True)
 
-            if newtable["FEBE"][0].strip() == "EMPTY":
-                newtable["FEBE"][0] = febe
-            else:
-                newtable.add_row([febe])
-
-            new_hdu = fits.table_to_hdu(newtable)
-            scan[1].data = new_hdu.data
-            scanheader = scan[1].header
-            scanheader["SITELONG"] = np.degrees(meta["SiteLongitude"])
-            scanheader["SITELAT"] = np.degrees(meta["SiteLatitude"])
-            scanheader["SITEELEV"] = meta["SiteHeight"]
-            diameter = 64.0 if meta["site"].lower().strip() == "srt" else 32.0
-            scanheader["DIAMETER"] = diameter
-            scanheader["PROJID"] = meta["Project_Name"]
+        scan = self._scan
+        newtable = Table(scan[1].data)
 
-            scan.writeto("tmp.fits", overwrite=True)
-        force_move_file("tmp.fits", os.path.join(self.dirname, self.SCAN))
+        if newtable["FEBE"][0].strip() == "EMPTY":
+            newtable["FEBE"][0] = febe
+        else:
+            newtable.add_row([febe])
+
+        new_hdu = fits.table_to_hdu(newtable)
+        scan[1].data = new_hdu.data
+        scanheader = scan[1].header
+        scanheader["SITELONG"] = np.degrees(meta["SiteLongitude"])
+        scanheader["SITELAT"] = np.degrees(meta["SiteLatitude"])
+        scanheader["SITEELEV"] = meta["SiteHeight"]
+        diameter = 64.0 if meta["site"].lower().strip() == "srt" else 32.0
+        scanheader["DIAMETER"] = diameter
+        scanheader["PROJID"] = meta["Project_Name"]
 
         return febe_name
 
     def update_scan_info(self):
+        self.scan_info = default_scan_info_table(self._scan_rows)
         info = get_observing_strategy_from_subscan_info(self.scan_info)
 
-        with fits.open(
-            os.path.join(self.dirname, self.SCAN), memmap=False
-        ) as scanhdul:
-            scanheader = scanhdul[1].header
-            # Todo: update with correct keywords
-            scanheader["CTYPE"] = info.ctype
-            scanheader["CTYPE1"] = "RA---GLS"
-            scanheader["CTYPE2"] = "DEC--GLS"
-            scanheader["CRVAL1"] = self.ra
-            scanheader["CRVAL2"] = self.dec
-            scanheader["BLONGOBJ"] = self.ra
-            scanheader["BLATOBJ"] = self.dec
-            scanheader["LONGOBJ"] = self.ra if not info.ctype[0] == "A" else 0
-            scanheader["LATOBJ"] = self.dec if not info.ctype[0] == "A" else 0
-            scanheader["EQUINOX"] = 2000.0
-            scanheader["GRPLC1"] = "GROUPING.fits"
-            scanheader["LST"] = self.lst
-            scanheader["LATPOLE"] = 90.0
-            scanheader["LONPOLE"] = 0.0
-            scanheader["PATLONG"] = 0
-            scanheader["MOVEFRAM"] = False
-            if info.ctype == "ALON/ALAT":
-                scanheader["WCSNAME"] = "Absolute horizontal"
-            scanheader["SCANTYPE"] = info.stype.upper()
-            scanheader["SCANDIR"] = info.direction.upper()
-            scanheader["SCANXVEL"] = info.scanvel
-            scanheader["SCANTIME"] = info.scantime
-            scanheader["SCANMODE"] = info.mode.upper()
-            scanheader["SCANGEOM"] = info.geom.upper()
-            scanheader["SCANLINE"] = 1
-            scanheader["SCANLEN"] = np.degrees(info.length)
-
-            scanheader["SCANYSPC"] = np.degrees(info.sep[1])
-            scanheader["SCANXSPC"] = np.degrees(info.sep[0])
-            scanheader["SCANPAR1"] = -999
-            scanheader["SCANPAR2"] = -999
-            scanheader["ZIGZAG"] = info.zigzag
-            scanheader["PHASE1"] = "sig"
-            scanheader["PHASE2"] = "sig"
-            scanheader["NOBS"] = info.nobs
-            scanheader["NSUBS"] = info.nobs
-            scanheader["WOBCYCLE"] = 0.0
-            scanheader["WOBDIR"] = "NONE"
-            scanheader["WOBMODE"] = "NONE"
-            scanheader["WOBPATT"] = "NONE"
-            scanhdul.writeto("tmp.fits", overwrite=True)
-        force_move_file("tmp.fits", os.path.join(self.dirname, self.SCAN))
+        scanheader = self._scan[1].header
+        # Todo: update with correct keywords
+        scanheader["CTYPE"] = info.ctype
+        scanheader["CTYPE1"] = "RA---GLS"
+        scanheader["CTYPE2"] = "DEC--GLS"
+        scanheader["CRVAL1"] = self.ra
+        scanheader["CRVAL2"] = self.dec
+        scanheader["BLONGOBJ"] = self.ra
+        scanheader["BLATOBJ"] = self.dec
+        scanheader["LONGOBJ"] = self.ra if not info.ctype[0] == "A" else 0
+        scanheader["LATOBJ"] = self.dec if not info.ctype[0] == "A" else 0
+        scanheader["EQUINOX"] = 2000.0
+        scanheader["GRPLC1"] = "GROUPING.fits"
+        scanheader["LST"] = self.lst
+        scanheader["LATPOLE"] = 90.0
+        scanheader["LONPOLE"] = 0.0
+        scanheader["PATLONG"] = 0
+        scanheader["MOVEFRAM"] = False
+        if info.ctype == "ALON/ALAT":
+            scanheader["WCSNAME"] = "Absolute horizontal"
+        scanheader["SCANTYPE"] = info.stype.upper()
+        scanheader["SCANDIR"] = info.direction.upper()
+        scanheader["SCANXVEL"] = info.scanvel
+        scanheader["SCANTIME"] = info.scantime
+        scanheader["SCANMODE"] = info.mode.upper()
+        scanheader["SCANGEOM"] = info.geom.upper()
+        scanheader["SCANLINE"] = 1
+        scanheader["SCANLEN"] = np.degrees(info.length)
+
+        scanheader["SCANYSPC"] = np.degrees(info.sep[1])
+        scanheader["SCANXSPC"] = np.degrees(info.sep[0])
+        scanheader["SCANPAR1"] = -999
+        scanheader["SCANPAR2"] = -999
+        scanheader["ZIGZAG"] = info.zigzag
+        scanheader["PHASE1"] = "sig"
+        scanheader["PHASE2"] = "sig"
+        scanheader["NOBS"] = info.nobs
+        scanheader["NSUBS"] = info.nobs
+        scanheader["WOBCYCLE"] = 0.0
+        scanheader["WOBDIR"] = "NONE"
+        scanheader["WOBMODE"] = "NONE"
+        scanheader["WOBPATT"] = "NONE"
+
+        self._write_scan_files()
 
     def wrap_up_file(self):
         import copy
 
+        self._update_grouping_table()
+        grouhdl = self._grouping
         prihdu = fits.PrimaryHDU()
-        with fits.open(
-            os.path.join(self.dirname, self.GROUPING), memmap=False
-        ) as grouhdl:
-            prihdu.header = copy.deepcopy(grouhdl[0].header)
-            file_list = list(
-                zip(
-                    grouhdl[1].data["MEMBER_LOCATION"],
-                    grouhdl[1].data["EXTNAME"],
-                    grouhdl[1].data["FEBE"],
-                )
+        prihdu.header = copy.deepcopy(grouhdl[0].header)
+        file_list = list(
+            zip(
+                grouhdl[1].data["MEMBER_LOCATION"],
+                grouhdl[1].data["EXTNAME"],
+                grouhdl[1].data["FEBE"],
             )
+        )
 
         hdulists = {}
         for febe in self.FEBE.keys():
             hdulists[febe] = fits.HDUList([prihdu])
 
-            with fits.open(
-                os.path.join(self.dirname, self.SCAN), memmap=False
-            ) as scanhdul:
-                scanhdul[1].data["FEBE"] = [febe]
-                newhdu = type(scanhdul[1])()
-                newhdu.data = scanhdul[1].data
-                newhdu.header = scanhdul[1].header
-                hdulists[febe].append(newhdu)
+            scanhdu = self._scan[1]
+            newhdu = type(scanhdu)()
+            newhdu.data = scanhdu.data.copy()
+            newhdu.data["FEBE"] = [febe]
+            newhdu.header = scanhdu.header.copy()
+            hdulists[febe].append(newhdu)
 
         for fname, ext, febe in file_list:
             if febe == "":
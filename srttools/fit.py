@@ -601,6 +601,11 @@ def fit_baseline_plus_bell(x, y, ye=None, kind="gauss"):
         raise ValueError("kind has to be one of: gauss, lorentz")
     from astropy.modeling import models, fitting
 
+    # Table columns are much slower than plain arrays when the model is
+    # evaluated at every iteration of the fit
+    x = np.asarray(x)
+    y = np.asarray(y)
+
     approx_m = (np.median(y[-20:]) - np.median(y[:20])) / (
         np.mean(x[-20:]) - np.mean(x[:20])
     )
@@ -97,11 +97,42 @@ CURR_CHANNEL = "Feed0_RCP"
 
 
 def _save_intermediate(filename, par):
-    np.savetxt(filename, par)
+    """Save the parameters as text, one per line, in the format of savetxt.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> par = np.array([1.5, -2e-10, 3])
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     fname = os.path.join(tmpdir, "intermediate.txt")
+    ...     _save_intermediate(fname, par)
+    ...     np.all(_get_saved_pars(fname) == par)
+    True
+    """
+    # tofile formats the numbers in C, much faster than savetxt
+    np.asarray(par, dtype=float).tofile(filename, sep="\n", format="%.18e")
 
 
 def _get_saved_pars(filename):
-    return np.genfromtxt(filename)
+    """Read the parameters saved by _save_intermediate.
+
+    Unlike ``np.fromfile``, which stops silently at the first value it
+    cannot parse, a corrupted file raises an error.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     fname = os.path.join(tmpdir, "intermediate.txt")
+    ...     with open(fname, "w") as fobj:
+    ...         _ = fobj.write("1.5\\n-2e-10\\n3x\\n4\\n")
+    ...     _get_saved_pars(fname)
+    Traceback (most recent call last):
+    ...
+    ValueError: could not convert string to float: '3x'
+    """
+    with open(filename) as fobj:
+        return np.array(fobj.read().split(), dtype=float)
 
 
 def _save_iteration(par):
@@ -373,7 +404,7 @@ def display_intermediate(
             filt = (X - centerx) ** 2 + (Y - centery) ** 2 < radius ** 2
             good[filt] = 0
 
-    bad = np.logical_not(good)
+    bad = ~good
 
     img_var[bad] = 0
 
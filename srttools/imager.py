@@ -13,6 +13,7 @@ import copy
 import functools
 from datetime import datetime
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 
 from scipy.stats import binned_statistic_2d
 from astropy import log
@@ -30,13 +31,15 @@ from .scan import Scan, list_scans
 from .read_config import read_config, sample_config_file
 from .utils import calculate_zernike_moments, calculate_beam_fom, HAS_MAHO
 from .utils import compare_anything, ds9_like_log_scale, jit
+from .utils import _init_scan_worker
 
-from .io import chan_re, get_channel_feed, detect_data_kind
+from .io import get_chan_columns, get_channel_feed, detect_data_kind
 from .fit import linear_fun
-from .interactive_filter import select_data
+from .interactive_filter import select_data, mask as zap_mask
 from .calibration import CalibratorTable
 from .opacity import calculate_opacity
 from .global_fit import fit_full_image
+from .histograms import histogram2d
 from .interactive_filter import create_empty_info
 
 try:
@@ -64,6 +67,25 @@ IMG_VER_STR = "__img_ver_dump_"
 __all__ = ["ScanSet"]
 
 
+def _load_scan(fname, **kwargs):
+    """Load a single scan, or return None if it cannot be processed.
+
+    The scan is returned as a plain :class:`astropy.table.Table` which, unlike
+    :class:`srttools.scan.Scan`, can be sent back from a worker process.
+    The caller wraps it into a :class:`srttools.scan.Scan` again.
+    """
+    try:
+        return Table(Scan(fname, **kwargs), copy=False)
+    except KeyError as e:
+        log.warning(
+            "Error while processing {}: Missing key: {}".format(fname, str(e))
+        )
+    except Exception as e:
+        log.warning(traceback.format_exc())
+        log.warning("Error while processing {}: {}".format(fname, str(e)))
+    return None
+
+
 def _load_and_merge_subscans(indices_and_subscans):
     """
 
@@ -315,6 +337,9 @@ class ScanSet(Table):
         self.plot = plot
         self.debug = debug
 
+        # Tables built here are not shared with anybody else, so their
+        # columns do not need to be copied again
+        is_new_table = True
         if data is None and config_file is None:
             pass
         elif isinstance(data, Iterable) and not isinstance(data, str):
@@ -327,13 +352,19 @@ class ScanSet(Table):
             data = self._read_data_from_config(data, **kwargs)
         elif not isinstance(data, Table):  # data needs to be a Table object
             raise ValueError(f"Invalid data: \n{data}")
+        else:
+            is_new_table = False
 
         if config_file is not None:
             data.meta["config_file"] = config_file
             config = read_config(config_file)
             self.meta.update(config)
 
-        super().__init__(data)
+        if data is not None and is_new_table:
+            # The metadata can still be shared, e.g. with the configuration
+            super().__init__(data, copy=False, meta=copy.deepcopy(data.meta))
+        else:
+            super().__init__(data)
 
         if data is not None and not "x" in self.colnames:
             self.convert_coordinates()
@@ -344,9 +375,7 @@ class ScanSet(Table):
     @property
     def chan_columns(self):
         if self._chan_columns is None:
-            self._chan_columns = np.array(
-                [i for i in self.columns if chan_re.match(i)]
-            )
+            self._chan_columns = get_chan_columns(self)
         return self._chan_columns
 
     @property
@@ -477,34 +506,56 @@ class ScanSet(Table):
                 )
 
     def load_scans(
-        self, scan_list, freqsplat=None, nofilt=False, debug=False, **kwargs
+        self,
+        scan_list,
+        freqsplat=None,
+        nofilt=False,
+        debug=False,
+        max_workers=1,
+        **kwargs,
     ):
-        """Load the scans in the list one by ones."""
-        for i, f in enumerate(show_progress(scan_list)):
-            try:
-                s = Scan(
-                    f,
-                    norefilt=self.norefilt,
-                    debug=debug,
-                    freqsplat=freqsplat,
-                    nofilt=nofilt,
-                    **kwargs,
-                )
-                yield i, s
-            except KeyError as e:
-                log.warning(
-                    "Error while processing {}: Missing key: {}".format(
-                        f, str(e)
-                    )
-                )
-            except Exception as e:
-                log.warning(traceback.format_exc())
-                log.warning("Error while processing {}: {}".format(f, str(e)))
+        """Load the scans in the list, optionally in parallel.
+
+        The scans are independent, so they can be loaded by up to
+        ``max_workers`` processes (default 1, i.e. serially; None means the
+        number of CPUs). They are yielded in the input order, skipping those
+        that could not be loaded. The config file is passed explicitly, as
+        worker processes do not always inherit the current one.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        load = functools.partial(
+            _load_scan,
+            config_file=self.meta.get("config_file"),
+            norefilt=self.norefilt,
+            debug=debug,
+            freqsplat=freqsplat,
+            nofilt=nofilt,
+            **kwargs,
+        )
+        nscan = len(scan_list)
+        scan_workers = min(max_workers, nscan)
+        if scan_workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=scan_workers,
+                initializer=_init_scan_worker,
+                initargs=(self.meta.get("config_file"),),
+            ) as executor:
+                scans = executor.map(load, scan_list)
+                for i, s in enumerate(show_progress(scans, total=nscan)):
+                    if s is not None:
+                        yield i, Scan(s, copy=False)
+        else:
+            for i, f in enumerate(show_progress(scan_list)):
+                s = load(f)
+                if s is not None:
+                    yield i, Scan(s, copy=False)
 
     def get_coordinates(self, frame="icrs"):
         """Give the coordinates as pairs of RA, DEC."""
         hor, ver = _coord_names(frame)
-        return np.array(np.dstack([self[hor], self[ver]]))
+        # A single (time, feed, 2) array, allocated once
+        return np.stack([np.asarray(self[hor]), np.asarray(self[ver])], -1)
 
     def get_obstimes(self):
         """Get :class:`astropy.time.Time` at the telescope location."""
@@ -645,11 +696,12 @@ class ScanSet(Table):
         self["x"] = np.zeros_like(self[hor])
         self["y"] = np.zeros_like(self[ver])
         coords = np.degrees(self.get_coordinates(frame=frame))
-        for f in range(len(self[hor][0, :])):
-            pixcrd = self.wcs.all_world2pix(coords[:, f], 0.5)
+        # Convert all feeds in a single call
+        pixcrd = self.wcs.all_world2pix(coords.reshape(-1, 2), 0.5)
+        pixcrd = pixcrd.reshape(coords.shape)
 
-            self["x"][:, f] = pixcrd[:, 0] + 0.5
-            self["y"][:, f] = pixcrd[:, 1] + 0.5
+        self["x"][:] = pixcrd[..., 0] + 0.5
+        self["y"][:] = pixcrd[..., 1] + 0.5
         self["x"].meta["frame"] = frame
         self["y"].meta["frame"] = frame
 
@@ -745,12 +797,6 @@ class ScanSet(Table):
             elif direction == 1:
                 good = good & np.logical_not(self["direction"])
 
-            expomap, _, _ = np.histogram2d(
-                self["x"][:, feed][good],
-                self["y"][:, feed][good],
-                bins=[xbins, ybins],
-            )
-
             counts = np.array(self[ch][good])
 
             if calibration is not None and calibrate_scans:
@@ -777,15 +823,12 @@ class ScanSet(Table):
             filtered_x = self["x"][:, feed][good]
             filtered_y = self["y"][:, feed][good]
 
-            img, _, _ = np.histogram2d(
-                filtered_x, filtered_y, bins=[xbins, ybins], weights=counts
-            )
-
-            img_sq, _, _ = np.histogram2d(
+            # Exposure, image and squared image share the same binning
+            (expomap, img, img_sq), _, _ = histogram2d(
                 filtered_x,
                 filtered_y,
                 bins=[xbins, ybins],
-                weights=counts ** 2,
+                weights=[None, counts, counts ** 2],
             )
 
             img_outliers, _, _, _ = binned_statistic_2d(
@@ -1111,8 +1154,8 @@ class ScanSet(Table):
 
             img = self.images[sdevch].copy()
             self.current = ch
-            bad = np.logical_or(img == 0, img != img)
-            img[bad] = np.mean(img[np.logical_not(bad)])
+            bad = np.logical_or(img == 0, np.isnan(img))
+            img[bad] = np.mean(img[~bad])
             fun = functools.partial(self.rerun_scan_analysis, test=test)
 
             imgsel = ImageSelector(img, ax, fun=fun, test=test)
@@ -1218,7 +1261,7 @@ class ScanSet(Table):
             np.abs(self["y"][:, feed] - y) < 1,
         )
 
-        sids = list(set(self["Scan_id"][good_entries]))
+        sids = np.unique(self["Scan_id"][good_entries]).tolist()
 
         for sid in sids:
             sname = self.scan_list[sid]
@@ -1283,16 +1326,10 @@ class ScanSet(Table):
         if len(zap_info.xs) > 0:
             resave = True
             xs = zap_info.xs
-            good = np.ones(len(s[dim]), dtype=bool)
-            if len(xs) >= 2:
-                intervals = list(zip(xs[:-1:2], xs[1::2]))
-                for i in intervals:
-                    i = sorted(i)
-                    good[
-                        np.logical_and(
-                            s[dim][:, feed] >= i[0], s[dim][:, feed] <= i[1]
-                        )
-                    ] = False
+            # Intervals can be selected in both directions
+            npairs = len(xs) // 2
+            xs = np.sort(np.reshape(xs[: 2 * npairs], (npairs, 2)), axis=1)
+            good = zap_mask(s[dim][:, feed], xs.ravel())
             s["{}-filt".format(ch)] = good
             self["{}-filt".format(ch)][mask] = good
 
@@ -1838,6 +1875,15 @@ def main_imager(args=None):
         "--bad-chans Feed2_RCP,Feed3_RCP )",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel processes used to load the scans "
+        "(default: 1)",
+    )
+
     parser.add_argument(
         "--splat",
         type=str,
@@ -1890,6 +1936,7 @@ def main_imager(args=None):
             avoid_regions=excluded_radec,
             nosave=args.nosave,
             plot=not args.noplot,
+            max_workers=args.jobs,
         )
         infile = args.config
 
@@ -1993,6 +2040,15 @@ def main_preprocess(args=None):
         ),
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel processes used to load the scans "
+        "(default: 1)",
+    )
+
     parser.add_argument(
         "-e",
         "--exclude",
@@ -2049,5 +2105,6 @@ def main_preprocess(args=None):
             interactive=args.interactive,
             avoid_regions=excluded_radec,
             nosave=args.nosave,
+            max_workers=args.jobs,
         )
     return 0
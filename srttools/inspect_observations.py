@@ -10,10 +10,7 @@ from .scan import list_scans
 from .calibration import read_calibrator_config
 from .read_config import sample_config_file
 
-try:
-    from ConfigParser import ConfigParser
-except ImportError:
-    from configparser import ConfigParser
+from configparser import ConfigParser
 
 __all__ = [
     "inspect_directories",
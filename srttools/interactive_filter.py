@@ -76,12 +76,30 @@ def mask(xs, border_xs, invert=False):
         Mask value is False if invert = False, and vice versa.
         E.g. for zapped intervals, invert = False. For baseline fit selections,
         invert = True
+
+    Examples
+    --------
+    >>> xs = np.arange(10)
+    >>> mask(xs, [1, 3, 2, 4, 8, 7]).astype(int)
+    array([1, 0, 0, 0, 0, 1, 1, 1, 1, 1])
+    >>> mask(xs, [8, 20], invert=True).astype(int)
+    array([0, 0, 0, 0, 0, 0, 0, 0, 1, 1])
     """
     good = np.ones(len(xs), dtype=bool)
     if len(border_xs) >= 2:
-        intervals = list(zip(border_xs[:-1:2], border_xs[1::2]))
-        for i in intervals:
-            good[np.logical_and(xs >= i[0], xs <= i[1])] = False
+        starts = np.asarray(border_xs[:-1:2])
+        ends = np.asarray(border_xs[1::2])
+        # Intervals with start > end do not contain anything
+        valid = starts <= ends
+        starts = np.sort(starts[valid])
+        ends = np.sort(ends[valid])
+        # The intervals starting before or at x, minus those ending before x,
+        # are those containing x. No loop over the intervals is needed
+        xs = np.asarray(xs)
+        n_containing = np.searchsorted(starts, xs, "right") - np.searchsorted(
+            ends, xs, "left"
+        )
+        good[n_containing > 0] = False
     if invert:
         good = np.logical_not(good)
 
@@ -19,10 +19,12 @@ from astropy import log
 import copy
 import re
 import glob
+import functools
+import math
 from collections.abc import Iterable
 from scipy.interpolate import interp1d
 
-from .utils import force_move_file
+from .utils import force_move_file, jit, HAS_NUMBA
 
 try:
     from sunpy.coordinates import frames, sun
@@ -67,6 +69,10 @@ locations = {
     "greenwich": EarthLocation(lat=51.477 * u.deg, lon=0 * u.deg),
 }
 
+# Feeds with smaller offsets than this (in radians) are considered on-axis
+# (usually feed 0), and their coordinates are not corrected
+_MIN_OFFSET_RAD = 0.001 / 60.0 * math.pi / 180.0
+
 
 def interpret_chan_name(chan_name):
     """Get feed, polarization and baseband info from chan name.
@@ -152,8 +158,23 @@ def classify_chan_columns(chans):
     return combinations
 
 
+@functools.lru_cache(maxsize=128)
+def _chan_columns_from_names(colnames):
+    return tuple(i for i in colnames if chan_re.match(i))
+
+
 def get_chan_columns(table):
-    return np.array([i for i in table.columns if chan_re.match(i)])
+    """List the columns of a table containing samples.
+
+    The regular expression is only run again for new sets of column names.
+
+    Examples
+    --------
+    >>> table = Table({"time": [0], "Feed0_LCP": [1], "Feed0_LCP-Temp": [2]})
+    >>> list(get_chan_columns(table))
+    ['Feed0_LCP']
+    """
+    return np.array(_chan_columns_from_names(tuple(table.colnames)))
 
 
 def get_channel_feed(ch):
@@ -252,6 +273,23 @@ def observing_angle(rest_angle, derot_angle):
     return rest_angle + (2 * np.pi * u.rad - derot_angle)
 
 
+def _observing_angle_rad(rest_angle, derot_angle):
+    """Calculate the observing angle of the multifeed, without units.
+
+    Same as ``observing_angle``, but inputs and output are plain floats or
+    arrays, in radians.
+
+    Examples
+    --------
+    >>> _observing_angle_rad(0, 2 * np.pi)
+    0.0
+    >>> np.allclose(_observing_angle_rad(np.array([0, np.pi]), np.pi),
+    ...             [np.pi, 2 * np.pi])
+    True
+    """
+    return rest_angle + (2 * np.pi - derot_angle)
+
+
 def _rest_angle_default(n_lat_feeds):
     """Default rest angles for a multifeed, in units of a circle
 
@@ -339,9 +377,8 @@ def update_table_with_sun_coords(new_table, sun_frame=None):
         new_table[lat_str] = np.zeros_like(new_table["az"])
         new_table["dsun"] = np.zeros(len(new_table["az"]))
 
+    obstimes = Time(new_table["time"] * u.day, format="mjd", scale="utc")
     for i in range(0, new_table["el"].shape[1]):
-        obstimes = Time(new_table["time"] * u.day, format="mjd", scale="utc")
-
         lon, lat, dist = get_sun_coords_from_radec(
             obstimes,
             new_table["ra"][:, i],
@@ -356,20 +393,67 @@ def update_table_with_sun_coords(new_table, sun_frame=None):
     return new_table
 
 
+@jit(nopython=True, fastmath=True, cache=True)
+def _apply_altaz_offsets_numba(el, az, xoffs, yoffs):  # pragma: no cover
+    for i in range(el.size):
+        el[i] += yoffs[i]
+        az[i] += xoffs[i] / np.cos(el[i])
+
+
+def _can_flatten_inplace(array):
+    """Numba can modify this array in place through a flattened view."""
+    return array.dtype.isnative and (
+        array.ndim == 1 or array.flags.c_contiguous
+    )
+
+
+def _apply_altaz_offsets(el, az, xoffs, yoffs):
+    """Shift elevation and azimuth by the feed offsets, in place.
+
+    All angles are in radians. The compiled version is only used if Numba
+    is installed and the arrays are in native byte order (arrays read from
+    FITS files are usually big-endian).
+    """
+    xoffs = np.broadcast_to(xoffs, el.shape)
+    yoffs = np.broadcast_to(yoffs, el.shape)
+    if HAS_NUMBA and _can_flatten_inplace(el) and _can_flatten_inplace(az):
+        _apply_altaz_offsets_numba(
+            el.reshape(-1), az.reshape(-1), xoffs.ravel(), yoffs.ravel()
+        )
+        return
+    el += yoffs
+    az += xoffs / np.cos(el)
+
+
 def get_coords_from_altaz_offset(
     obstimes, el, az, xoffs, yoffs, location, inplace=False
 ):
-    """"""
+    """Calculate the sky coordinates pointed by feeds offset from el and az.
+
+    ``el``, ``az`` and the offsets can also be 2-d arrays, with one row per
+    feed, as long as they broadcast with ``obstimes``.
+    """
     # Calculate observing angle
     if not inplace:
-        el = copy.deepcopy(el)
-        az = copy.deepcopy(az)
+        # Native-endian, contiguous copies (FITS columns are big-endian).
+        # This way the byte swap is done once, in bulk, and the compiled
+        # kernel can be used
+        el = np.array(el, dtype=np.float64)
+        az = np.array(az, dtype=np.float64)
 
-    el += yoffs.to(u.rad).value
-    az += xoffs.to(u.rad).value / np.cos(el)
+    # Offsets without units are assumed in radians
+    if hasattr(xoffs, "unit"):
+        xoffs = xoffs.to_value(u.rad)
+    if hasattr(yoffs, "unit"):
+        yoffs = yoffs.to_value(u.rad)
+
+    _apply_altaz_offsets(np.asarray(el), np.asarray(az), xoffs, yoffs)
 
     coords = AltAz(
-        az=Angle(az), alt=Angle(el), location=location, obstime=obstimes
+        az=Angle(az, u.rad),
+        alt=Angle(el, u.rad),
+        location=location,
+        obstime=obstimes,
     )
 
     # According to line_profiler, coords.icrs is *by far* the longest
@@ -411,19 +495,20 @@ def update_table_with_offsets(new_table, xoffsets, yoffsets, inplace=False):
         new_table[lon_str] = np.zeros_like(new_table["el"])
         new_table[lat_str] = np.zeros_like(new_table["az"])
 
+    # These are the same for all feeds
+    obstimes = Time(new_table["time"] * u.day, format="mjd", scale="utc")
+    location = locations[new_table.meta["site"]]
+
     for i in range(0, new_table["el"].shape[1]):
         obs_angle = observing_angle(rest_angles[i], new_table["derot_angle"])
 
         # offsets < 0.001 arcseconds: don't correct (usually feed 0)
         if (
-            np.abs(xoffsets[i]) < np.radians(0.001 / 60.0) * u.rad
-            and np.abs(yoffsets[i]) < np.radians(0.001 / 60.0) * u.rad
+            np.abs(xoffsets[i]) < _MIN_OFFSET_RAD * u.rad
+            and np.abs(yoffsets[i]) < _MIN_OFFSET_RAD * u.rad
         ):
             continue
         xoffs, yoffs = correct_offsets(obs_angle, xoffsets[i], yoffsets[i])
-        obstimes = Time(new_table["time"] * u.day, format="mjd", scale="utc")
-
-        location = locations[new_table.meta["site"]]
         lon, lat = get_coords_from_altaz_offset(
             obstimes,
             new_table["el"][:, i],
@@ -441,7 +526,7 @@ def update_table_with_offsets(new_table, xoffsets, yoffsets, inplace=False):
 
 def print_obs_info_fitszilla(fname):
     """Placeholder for function that prints out oberving information."""
-    with fits.open(fname, memmap=False) as lchdulist:
+    with fits.open(fname, memmap=True) as lchdulist:
         section_table_data = lchdulist["SECTION TABLE"].data
         sample_rates = get_value_with_units(section_table_data, "sampleRate")
 
@@ -473,8 +558,29 @@ def _chan_name(f, p, c=None):
         return "Feed{}_{}".format(f, p)
 
 
+def _add_column_view(table, name, column):
+    """Add a column to the table without copying its data.
+
+    ``column`` is usually a slice of another column of the same table, so
+    the data are shared with it instead of being copied.
+
+    Examples
+    --------
+    >>> table = Table({"ch0": np.arange(6).reshape(3, 2)})
+    >>> _add_column_view(table, "a", table["ch0"][:, :1])
+    >>> np.shares_memory(table["a"], table["ch0"])
+    True
+    >>> table.colnames
+    ['ch0', 'a']
+    """
+    if name in table.colnames:
+        table.replace_column(name, column, copy=False)
+    else:
+        table.add_column(column, name=name, copy=False)
+
+
 def read_data_fitszilla(fname):
-    with fits.open(fname, memmap=False) as lchdulist:
+    with fits.open(fname, memmap=True) as lchdulist:
         retval = _read_data_fitszilla(lchdulist)
     return retval
 
@@ -676,10 +782,11 @@ def _read_data_fitszilla(lchdulist):
 
     # -------------- Read data!-----------------------------------------
     datahdu = lchdulist["DATA TABLE"]
-    # N.B.: there is an increase in memory usage here. This is just because
-    # data are being read from the file at this point, not before.
-    data_table_data = Table(datahdu.data)
-    tempdata = Table(lchdulist["ANTENNA TEMP TABLE"].data)
+    # N.B.: the file is memory-mapped and the tables are not copied, so
+    # data are only read from disk when the columns are used. The memory map
+    # is copy-on-write, so that the columns can still be modified in place.
+    data_table_data = Table(datahdu.data, copy=False)
+    tempdata = Table(lchdulist["ANTENNA TEMP TABLE"].data, copy=False)
 
     for col in data_table_data.colnames:
         if col == col.lower():
@@ -767,7 +874,8 @@ def _read_data_fitszilla(lchdulist):
             section_name = "ch{}".format(s)
             ch = _chan_name(f, p, c)
             start, end = ic * nbin_per_chan, (ic + 1) * nbin_per_chan
-            data_table_data[ch] = data_table_data[section_name][:, start:end]
+            section_data = data_table_data[section_name]
+            _add_column_view(data_table_data, ch, section_data[:, start:end])
 
         if is_polarized:
             # for f, ic, p, s in zip(feeds, IFs, polarizations, sections):
@@ -781,12 +889,13 @@ def _read_data_fitszilla(lchdulist):
                 qname, uname = _chan_name(f, "Q", c), _chan_name(f, "U", c)
                 qstart, qend = 2 * nbin_per_chan, 3 * nbin_per_chan
                 ustart, uend = 3 * nbin_per_chan, 4 * nbin_per_chan
-                data_table_data[qname] = data_table_data[section_name][
-                    :, qstart:qend
-                ]
-                data_table_data[uname] = data_table_data[section_name][
-                    :, ustart:uend
-                ]
+                section_data = data_table_data[section_name]
+                _add_column_view(
+                    data_table_data, qname, section_data[:, qstart:qend]
+                )
+                _add_column_view(
+                    data_table_data, uname, section_data[:, ustart:uend]
+                )
 
                 chan_names += [qname, uname]
 
@@ -796,7 +905,8 @@ def _read_data_fitszilla(lchdulist):
                 data_table_data.remove_column(section_name)
     else:
         for ic, ch in enumerate(chan_names):
-            data_table_data[ch] = data_table_data["ch{}".format(chan_ids[ic])]
+            section_data = data_table_data["ch{}".format(chan_ids[ic])]
+            _add_column_view(data_table_data, ch, section_data[:])
 
     # ----------- Read temperature data, if possible ----------------
     for ic, ch in enumerate(chan_names):
@@ -2,7 +2,7 @@
 
 
 import os
-import glob
+import copy
 import warnings
 import numpy as np
 import astropy.units as u
@@ -19,6 +19,8 @@ __all__ = ["sample_config_file", "get_config_file", "read_config"]
 
 SRT_tools_config_file = None
 SRT_tools_config = None
+# Configurations already read, by (absolute path, modification time)
+SRT_tools_config_cache = {}
 
 
 def sample_config_file(fname="sample_config_file.ini"):
@@ -68,6 +70,10 @@ pixel_size : 1
 ;; lines
 goodchans :
 
+;; Floating point precision of spectra during RFI filtering. float32 halves
+;; the memory needed, at the price of a (small) loss of accuracy
+;    precision : float32
+
 [debugging]
 
 debug_file_format : jpg
@@ -83,22 +89,30 @@ def get_config_file():
     return SRT_tools_config_file
 
 
-def read_config(fname=None):
-    """Read a config file and return a dictionary of all entries."""
-    global SRT_tools_config_file, SRT_tools_config
+def _parse_list(string):
+    """Split a multi-line config value into a list, dropping blank lines.
 
-    # --- If already read, use existing config ---
-    if fname == SRT_tools_config_file and SRT_tools_config is not None:
-        return SRT_tools_config
+    Examples
+    --------
+    >>> _parse_list("\\ndir1\\n  dir2 \\n\\n")
+    ['dir1', 'dir2']
+    >>> _parse_list("")
+    []
+    """
+    return [s for s in map(str.strip, string.splitlines()) if s]
 
-    if fname is None and SRT_tools_config is not None:
-        return SRT_tools_config
 
-    # ---------------------------------------------
+def read_config(fname=None):
+    """Read a config file and return a dictionary of all entries.
 
-    config_output = {}
+    The file is only parsed again if it was modified since the last time it
+    was read. Each call returns a copy of the cached entries, which callers
+    are free to modify.
+    """
+    global SRT_tools_config_file, SRT_tools_config
 
-    Config = configparser.ConfigParser()
+    if fname is None and SRT_tools_config is not None:
+        return copy.deepcopy(SRT_tools_config)
 
     if fname is None:
         fname = sample_config_file()
@@ -107,6 +121,19 @@ def read_config(fname=None):
             raise FileNotFoundError("Please specify an existing config file")
 
     SRT_tools_config_file = fname
+
+    # --- If already read, use existing config ---
+    key = (os.path.abspath(fname), os.path.getmtime(fname))
+    if key in SRT_tools_config_cache:
+        SRT_tools_config = SRT_tools_config_cache[key]
+        return copy.deepcopy(SRT_tools_config)
+
+    # ---------------------------------------------
+
+    config_output = {}
+
+    Config = configparser.ConfigParser()
+
     Config.read(fname)
 
     # ---------- Set default values --------------------------------------
@@ -125,6 +152,7 @@ def read_config(fname=None):
     config_output["noise_threshold"] = "5"
     config_output["smooth_window"] = "0.05"
     config_output["debug_file_format"] = "jpg"
+    config_output["precision"] = None
 
     # --------------------------------------------------------------------
 
@@ -133,15 +161,13 @@ def read_config(fname=None):
     local_params = dict(Config.items("local"))
 
     config_output.update(local_params)
-    if not config_output["workdir"].startswith("/"):
-        config_output["workdir"] = os.path.abspath(
-            os.path.join(os.path.split(fname)[0], config_output["workdir"])
-        )
-
-    if not config_output["datadir"].startswith("/"):
-        config_output["datadir"] = os.path.abspath(
-            os.path.join(os.path.split(fname)[0], config_output["datadir"])
-        )
+    # Relative paths are relative to the directory of the config file
+    config_dir = os.path.dirname(os.fspath(fname))
+    for dirkey in ["workdir", "datadir"]:
+        if not os.path.isabs(config_output[dirkey]):
+            config_output[dirkey] = os.path.abspath(
+                os.path.join(config_dir, config_output[dirkey])
+            )
 
     if (
         config_output["productdir"] is not None
@@ -149,11 +175,11 @@ def read_config(fname=None):
     ):
         config_output["productdir"] = None
 
-    if config_output["productdir"] is not None and not config_output[
-        "productdir"
-    ].startswith("/"):
+    if config_output["productdir"] is not None and not os.path.isabs(
+        config_output["productdir"]
+    ):
         config_output["productdir"] = os.path.abspath(
-            os.path.join(os.path.split(fname)[0], config_output["productdir"])
+            os.path.join(config_dir, config_output["productdir"])
         )
 
     try:
@@ -170,41 +196,40 @@ def read_config(fname=None):
     config_output.update(analysis_params)
 
     try:
-        config_output["list_of_directories"] = [
-            s
-            for s in analysis_params["list_of_directories"].splitlines()
-            if s.strip()
-        ]  # This last instruction eliminates blank lines
+        config_output["list_of_directories"] = _parse_list(
+            analysis_params["list_of_directories"]
+        )
     except Exception:
         warnings.warn("Invalid list_of_directories in config file")
 
     try:
-        config_output["calibrator_directories"] = [
-            s
-            for s in analysis_params["calibrator_directories"].splitlines()
-            if s.strip()
-        ]  # This last instruction eliminates blank lines
+        config_output["calibrator_directories"] = _parse_list(
+            analysis_params["calibrator_directories"]
+        )
     except Exception:
         warnings.warn("Invalid calibrator_directories in config file")
 
     try:
-        config_output["skydip_directories"] = [
-            s
-            for s in analysis_params["skydip_directories"].splitlines()
-            if s.strip()
-        ]  # This last instruction eliminates blank lines
+        config_output["skydip_directories"] = _parse_list(
+            analysis_params["skydip_directories"]
+        )
     except Exception:
         warnings.warn("Invalid skydip_directories in config file")
 
     # If the list of directories is not specified, or if a '*' symbol is used,
-    # use glob in the datadir to determine the list
+    # use all the directories in the datadir
 
     if config_output["list_of_directories"] in ([], ["*"], "*"):
-        config_output["list_of_directories"] = [
-            os.path.split(f)[1]  # return name without path
-            for f in glob.glob(os.path.join(config_output["datadir"], "*"))
-            if os.path.isdir(f)
-        ]  # only if it's a directory
+        config_output["list_of_directories"] = []
+        if os.path.isdir(config_output["datadir"]):
+            # scandir knows the entry type without a stat call per entry.
+            # Like glob, skip hidden entries
+            with os.scandir(config_output["datadir"]) as entries:
+                config_output["list_of_directories"] = [
+                    e.name
+                    for e in entries
+                    if e.is_dir() and not e.name.startswith(".")
+                ]
 
     config_output["pixel_size"] = (
         float(np.radians(float(config_output["pixel_size"]) / 60)) * u.rad
@@ -222,4 +247,5 @@ def read_config(fname=None):
     )
 
     SRT_tools_config = config_output
-    return config_output
+    SRT_tools_config_cache[key] = SRT_tools_config
+    return copy.deepcopy(SRT_tools_config)
@@ -27,8 +27,8 @@ from .io import mkdir_p
 from .read_config import read_config, get_config_file
 from .fit import ref_mad, contiguous_regions
 from .fit import baseline_rough, baseline_als, linear_fun
-from .interactive_filter import select_data
-from .utils import vectorize, HAS_NUMBA
+from .interactive_filter import select_data, mask as zap_mask
+from .utils import jit, vectorize, HAS_NUMBA
 
 __all__ = [
     "Scan",
@@ -68,6 +68,39 @@ else:
         return angle
 
 
+if HAS_NUMBA:
+
+    @jit(nopython=True, error_model="numpy")
+    def _spectral_variability(
+        dynamical_spectrum, meanspec, varimg
+    ):  # pragma: no cover
+        """Fill the variability image, return the summed square deviations.
+
+        The dynamical spectrum is read only once, and no temporary array
+        of its size is created.
+        """
+        dynspec_len, nbin = dynamical_spectrum.shape
+        sum_sq = np.zeros_like(meanspec)
+        for i in range(dynspec_len):
+            for j in range(nbin):
+                deviation = dynamical_spectrum[i, j] - meanspec[j]
+                varimg[i, j] = np.abs(deviation) / meanspec[j]
+                sum_sq[j] += deviation * deviation
+        return sum_sq
+
+
+else:
+
+    def _spectral_variability(dynamical_spectrum, meanspec, varimg):
+        """Fill the variability image, return the summed square deviations."""
+        deviation = dynamical_spectrum - meanspec
+        np.abs(deviation, out=varimg)
+        varimg /= meanspec
+
+        deviation **= 2
+        return np.sum(deviation, axis=0)
+
+
 def product_path_from_file_name(fname, workdir=".", productdir=None):
     """
     Examples
@@ -211,10 +244,8 @@ def _clean_dyn_spec(dynamical_spectrum, bad_intervals):
             next_bin = np.array(dynamical_spectrum[:, b[1]])
             fill_lc = (previous + next_bin) / 2
 
-        for bsub in range(b[0], np.min([b[1], dynamical_spectrum.shape[1]])):
-            cleaned_dynamical_spectrum[:, bsub] = fill_lc
-        if b[0] == 0 or b[1] >= dynamical_spectrum.shape[1]:
-            continue
+        # Fill all the bins of the interval at once, by broadcasting
+        cleaned_dynamical_spectrum[:, b[0] : b[1]] = fill_lc[:, np.newaxis]
     return cleaned_dynamical_spectrum
 
 
@@ -257,7 +288,9 @@ def pickle_or_not(results, filename, test_data, min_MB=50):
     if sys.getsizeof(test_data) > min_MB * 1e6:
         log.info("The data set is large. Using partial data dumps")
         with open(filename, "wb") as fobj:
-            pickle.dump(results, fobj)
+            # From protocol 5, numpy arrays are written from their own
+            # buffers, without an intermediate copy into a bytes object
+            pickle.dump(results, fobj, protocol=pickle.HIGHEST_PROTOCOL)
             results = filename
     return results
 
@@ -275,6 +308,11 @@ def _get_spectrum_stats(
 ):
 
     results = StatResults()
+    # Native byte order and contiguous, as needed by compiled code
+    dynamical_spectrum = np.ascontiguousarray(
+        dynamical_spectrum,
+        dtype=dynamical_spectrum.dtype.newbyteorder("="),
+    )
     dynspec_len, nbin = dynamical_spectrum.shape
     # Calculate spectral variability curve
 
@@ -304,14 +342,9 @@ def _get_spectrum_stats(
         )
         return results
 
-    spectral_var = (
-        np.sqrt(
-            np.sum((dynamical_spectrum - meanspec) ** 2, axis=0) / dynspec_len
-        )
-        / meanspec
-    )
-
-    varimg = np.sqrt((dynamical_spectrum - meanspec) ** 2) / meanspec
+    varimg = np.empty(dynamical_spectrum.shape, dtype=meanspec.dtype)
+    sum_sq = _spectral_variability(dynamical_spectrum, meanspec, varimg)
+    spectral_var = np.sqrt(sum_sq / dynspec_len) / meanspec
 
     # Set up corrected spectral var
 
@@ -319,9 +352,8 @@ def _get_spectrum_stats(
     mod_spectral_var[0:binmin] = spectral_var[binmin]
     mod_spectral_var[binmax:] = spectral_var[binmax]
 
-    # Some statistical information on spectral var
-
-    # median_spectral_var = np.median(mod_spectral_var[freqmask])
+    # Reference noise level of the spectral variability, from the median
+    # absolute deviation of its first differences (see ref_mad)
     stdref = ref_mad(mod_spectral_var[freqmask], 20)
 
     # Calculate baseline of spectral var ---------------
@@ -355,7 +387,6 @@ def _get_spectrum_stats(
     results.bandwidth = bandwidth
     results.mask = mask
     results.spectral_var = spectral_var
-    results.freqmask = freqmask
     results.varimg = varimg
     results.baseline = baseline
     results.thresh_low = threshold_low
@@ -446,7 +477,7 @@ def _clean_spectrum(dynamical_spectrum, stat_file, length, filename):
 
     wholemask = spec_stats.wholemask
 
-    bad_intervals = contiguous_regions(np.logical_not(wholemask))
+    bad_intervals = contiguous_regions(~wholemask)
 
     # Calculate cleaned dynamical spectrum
 
@@ -454,7 +485,10 @@ def _clean_spectrum(dynamical_spectrum, stat_file, length, filename):
         dynamical_spectrum, bad_intervals
     )
 
-    lc_corr = np.sum(cleaned_dynamical_spectrum[:, freqmask], axis=1)
+    # Accumulate in double precision, even if the spectrum is single precision
+    lc_corr = np.sum(
+        cleaned_dynamical_spectrum[:, freqmask], axis=1, dtype=float
+    )
     if len(lc_corr) > 10:
         lc_corr = baseline_als(times, lc_corr, outlier_purging=False)
     else:
@@ -506,7 +540,7 @@ def plot_spectrum_cleaning_results(
     freqmax = spec_stats.freqmax
     df = spec_stats.df
 
-    bad_intervals = contiguous_regions(np.logical_not(wholemask))
+    bad_intervals = contiguous_regions(~wholemask)
 
     times = length * np.arange(dynspec_len) / dynspec_len
     lc = np.sum(dynamical_spectrum, axis=1)
@@ -949,11 +983,15 @@ class Scan(Table):
             self.meta["config_file"] = config_file
             self.meta.update(read_config(self.meta["config_file"]))
             h5name = self.root_name(data) + ".hdf5"
+            # True if the data come from a previous run and nothing changes
+            # them, so that they do not need to be saved again
+            is_saved = False
             if os.path.exists(h5name) and norefilt:
                 # but only if the modification time is later than the
                 # original file (e.g. the fits file was not modified later)
                 if os.path.getmtime(h5name) > os.path.getmtime(data):
                     data = h5name
+                    is_saved = True
             if debug:
                 log.info("Loading file {}".format(data))
             table = read_data(data)
@@ -978,10 +1016,12 @@ class Scan(Table):
 
             if interactive:
                 self.interactive_filter()
+                is_saved = False
 
             if (
                 ("backsub" not in self.meta.keys() or not self.meta["backsub"])
             ) and not nosub:
+                is_saved = False
                 log.debug(
                     f"Subtracting the baseline from "
                     f'{self.meta["filename"]}'
@@ -993,7 +1033,7 @@ class Scan(Table):
                 except Exception as e:
                     log.error(f"Baseline subtraction failed: {str(e)}")
 
-            if not nosave:
+            if not nosave and not is_saved:
                 self.save()
 
     def chan_columns(self):
@@ -1073,6 +1113,10 @@ class Scan(Table):
             warnings.warn("Don't use filtering factors > 0.5. Skipping.")
             return
 
+        # E.g. float32, to halve the memory used by the filtering. If None,
+        # the data type of the input data is kept
+        precision = self.meta.get("precision")
+
         chans = self.chan_columns()
         is_polarized = False
         mask = True
@@ -1082,7 +1126,7 @@ class Scan(Table):
                 continue
 
             results = clean_scan_using_variability(
-                np.array(self[ch]),
+                np.array(self[ch], dtype=precision),
                 86400 * (self["time"][-1] - self["time"][0]),
                 self[ch].meta["bandwidth"],
                 good_mask=good_mask,
@@ -1249,16 +1293,7 @@ class Scan(Table):
 
             # Treat zapped intervals
             xs = info["Ch"]["zap"].xs
-            good = np.ones(len(self[dim]), dtype=bool)
-            if len(xs) >= 2:
-                intervals = list(zip(xs[:-1:2], xs[1::2]))
-                for i in intervals:
-                    good[
-                        np.logical_and(
-                            self[dim][:, feed] >= i[0],
-                            self[dim][:, feed] <= i[1],
-                        )
-                    ] = False
+            good = zap_mask(self[dim][:, feed], xs)
             self["{}-filt".format(ch)] = good
 
             if len(info["Ch"]["fitpars"]) > 1:
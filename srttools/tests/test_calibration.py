@@ -5,6 +5,11 @@ import subprocess as sp
 
 from srttools.calibration import CalibratorTable
 from srttools.calibration import main_lcurve, _get_flux_quantity, main_cal
+from srttools.calibration import (
+    _get_calibrator_flux,
+    _cached_calibrator_config,
+    flux_function,
+)
 from srttools.read_config import read_config
 from srttools.scan import list_scans
 from srttools.simulate import sim_crossscans, _2d_gauss
@@ -12,6 +17,7 @@ from srttools.io import mkdir_p
 from srttools.utils import compare_strings, HAS_MPL
 import pytest
 from astropy import log
+from astropy.table import Table
 from astropy.logger import logging
 import numpy as np
 
@@ -219,6 +225,29 @@ class TestCalibration(object):
         )
         assert (dummy_flux[0] - 0.52) < dummy_flux_err[0] * 3
 
+    def test_calibrated_single_source_row(self):
+        caltable = CalibratorTable.read(self.calfile)
+        caltable = caltable[caltable["Chan"] == "Feed0_LCP"]
+        is_src = caltable["Source"] == "DummySrc"
+        first_src = np.argmax(is_src)
+        caltable = caltable[~is_src | (np.arange(len(caltable)) == first_src)]
+        dummy_flux, dummy_flux_err = caltable.calculate_src_flux(
+            source="DummySrc", channel="Feed0_LCP"
+        )
+        assert len(dummy_flux) == 1
+        assert np.isfinite(dummy_flux[0]) and np.isfinite(dummy_flux_err[0])
+
+    def test_from_scans_parallel(self):
+        scan_list = list_scans(self.caldir, ["./"])
+        serial = CalibratorTable()
+        serial.from_scans(scan_list, config_file=self.config_file)
+        parallel = CalibratorTable()
+        parallel.from_scans(
+            scan_list, config_file=self.config_file, max_workers=2
+        )
+        assert len(parallel) == len(serial)
+        assert np.allclose(parallel["Counts"], serial["Counts"])
+
     def test_check_consistency_fails_with_bad_data(self):
         scan_list = (
             list_scans(self.caldir, ["./"])
@@ -288,12 +317,39 @@ class TestCalibration(object):
         assert os.path.exists("DummySrc.csv")
         os.unlink("DummySrc.csv")
 
+    def test_lcurve_with_missing_source(self, caplog):
+        main_lcurve([self.calfile, "-s", "DummySrc", "Missing"])
+        assert "No data for source Missing" in caplog.text
+        for fname in ["DummySrc.csv", "Missing.csv"]:
+            assert os.path.exists(fname)
+        assert len(Table.read("Missing.csv")) == 0
+        assert len(Table.read("DummySrc.csv")) > 0
+        os.unlink("DummySrc.csv")
+        os.unlink("Missing.csv")
+
     def test_lcurve_with_all_sources(self):
         main_lcurve(["-c", self.config_file])
         assert os.path.exists("DummySrc.csv")
         assert os.path.exists("DummyCal.csv")
         assert os.path.exists("DummyCal2.csv")
 
+    def test_calibrator_config_is_parsed_once(self):
+        flux, eflux = _get_calibrator_flux("DummyCal", 7.3)
+        hits = _cached_calibrator_config.cache_info().hits
+        assert _get_calibrator_flux("DummyCal", 7.3) == (flux, eflux)
+        assert _cached_calibrator_config.cache_info().hits == hits + 1
+
+    def test_flux_function_with_0d_arrays(self):
+        flux = flux_function(np.array(7.0), np.array(0.68), [1, 0.1], [0, 0])
+        assert flux == flux_function(7.0, 0.68, [1, 0.1], [0, 0])
+
+    def test_get_fluxes_reads_calibrator_files_once(self):
+        caltable = CalibratorTable.read(self.calfile)
+        info = _cached_calibrator_config.cache_info()
+        caltable.get_fluxes()
+        new_info = _cached_calibrator_config.cache_info()
+        assert new_info.hits + new_info.misses == info.hits + info.misses + 1
+
     @classmethod
     def teardown_class(klass):
         """Clean up the mess."""
@@ -1,4 +1,5 @@
 from srttools.convert import convert_to_complete_fitszilla, main_convert
+from srttools.convert import _list_subscan_files
 from srttools.scan import Scan
 import numpy as np
 import os
@@ -7,7 +8,7 @@ import subprocess as sp
 import shutil
 import glob
 from astropy.io import fits
-from srttools.io import locations
+from srttools.io import locations, _MIN_OFFSET_RAD
 from srttools.simulate import (
     DEFAULT_CAL_OFFSET,
     DEFAULT_PEAK_COUNTS,
@@ -78,6 +79,37 @@ class Test1_Scan(object):
             assert np.allclose(scan0[col], scan1[col])
         os.unlink("converted.fits")
 
+    def test_conversion_parallel(self):
+        # The feeds are split among processes: there must be more than one
+        with fits.open(self.fname) as hdul:
+            feeds = hdul["FEED TABLE"].data
+            active = (np.abs(feeds["xOffset"]) >= _MIN_OFFSET_RAD) | (
+                np.abs(feeds["yOffset"]) >= _MIN_OFFSET_RAD
+            )
+        assert np.count_nonzero(active) > 1
+
+        convert_to_complete_fitszilla(self.fname, "converted", max_workers=1)
+        convert_to_complete_fitszilla(self.fname, "converted_p", max_workers=2)
+        with fits.open("converted.fits") as hdul0:
+            with fits.open("converted_p.fits") as hdul1:
+                assert len(hdul0) == len(hdul1)
+                for hdu0, hdu1 in zip(hdul0, hdul1):
+                    if not hdu0.name.startswith("COORD"):
+                        continue
+                    for col in ["raj2000", "decj2000", "el", "az"]:
+                        assert np.allclose(hdu0.data[col], hdu1.data[col])
+        os.unlink("converted.fits")
+        os.unlink("converted_p.fits")
+
+    def test_conversion_failure_leaves_no_files(self, tmp_path):
+        fname = str(tmp_path / "bad_site.fits")
+        with fits.open(self.fname) as hdul:
+            hdul[0].header["ANTENNA"] = "Nowhere"
+            hdul.writeto(fname)
+        with pytest.raises(KeyError):
+            convert_to_complete_fitszilla(fname, str(tmp_path / "converted"))
+        assert os.listdir(tmp_path) == ["bad_site.fits"]
+
     def test_conversion_same_name_fails(self):
         with pytest.raises(ValueError):
             convert_to_complete_fitszilla(self.fname, self.fname)
@@ -87,6 +119,27 @@ class Test1_Scan(object):
         assert os.path.exists(self.fname.replace(".fits", "_fitsmod.fits"))
         os.unlink(self.fname.replace(".fits", "_fitsmod.fits"))
 
+    def test_main_dir_parallel(self, tmp_path):
+        for label in ["a", "b"]:
+            shutil.copyfile(self.fname, tmp_path / f"{label}.fits")
+        main_convert([str(tmp_path), "-f", "fitsmod", "--jobs", "2"])
+        for label in ["a", "b"]:
+            assert os.path.exists(tmp_path / f"{label}_fitsmod.fits")
+
+    def test_list_subscan_files(self, tmp_path):
+        for fname in [
+            "b.fits",
+            "a.fits",
+            "a_summary.fits",
+            "summary.fits",
+            ".hidden.fits",
+            "a.txt",
+        ]:
+            (tmp_path / fname).touch()
+        (tmp_path / "dir.fits").mkdir()
+        files = [os.path.basename(f) for f in _list_subscan_files(tmp_path)]
+        assert files == ["a.fits", "a_summary.fits", "b.fits"]
+
     def test_main_locally(self):
         main_convert([self.fname, "-f", "fitsmod", "--save-locally"])
         fname = os.path.basename(self.fname)
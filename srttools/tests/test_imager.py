@@ -240,6 +240,23 @@ class TestScanSet(object):
             list(set(scanset.meta["list_of_directories"]))
         )
 
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_load_scans_uses_scanset_config(self, max_workers):
+        # Worker processes must not depend on the current config file
+        scan_list = [
+            s for s in self.scanset.scan_list if "defective" not in s
+        ][:2]
+        read_config(self.raonly)
+        try:
+            scans = list(
+                self.scanset.load_scans(scan_list, max_workers=max_workers)
+            )
+        finally:
+            read_config(self.config_file)
+        assert len(scans) == 2
+        for _, scan in scans:
+            assert scan.meta["config_file"] == self.config_file
+
     def test_roundtrip(self):
         sc0 = ScanSet("test.hdf5")
         sc0.write("bububu.hdf5", overwrite=True)
@@ -10,7 +10,8 @@ import pytest
 
 from srttools.scan import Scan, HAS_MPL, clean_scan_using_variability
 from srttools.io import print_obs_info_fitszilla, bulk_change, main_bulk_change
-from srttools.io import locations, read_data_fitszilla, mkdir_p
+from srttools.io import locations, read_data_fitszilla, mkdir_p, read_data
+from srttools.io import get_coords_from_altaz_offset
 from srttools.utils import compare_anything
 import os
 import numpy as np
@@ -289,6 +290,24 @@ class Test1_Scan(object):
             ]
         )
 
+    def test_coords_from_big_endian_altaz(self):
+        obstimes = Time(57000 + np.arange(10) / 86400, format="mjd")
+        el = np.linspace(0.5, 1, 10)
+        az = np.linspace(1, 2, 10)
+        el_be = el.astype(">f8")
+        az_be = az.astype(">f8")
+        ra, dec = get_coords_from_altaz_offset(
+            obstimes, el, az, 0.001, 0.002, location=locations["srt"]
+        )
+        ra_be, dec_be = get_coords_from_altaz_offset(
+            obstimes, el_be, az_be, 0.001, 0.002, location=locations["srt"]
+        )
+        assert np.allclose(ra_be, ra)
+        assert np.allclose(dec_be, dec)
+        # The input arrays are left untouched
+        assert np.all(el_be == el)
+        assert np.all(az_be == az)
+
     @classmethod
     def teardown_class(klass):
         """Cleanup."""
@@ -404,6 +423,22 @@ class Test2_Scan(object):
                 ]
             )
 
+    def test_scan_clean_and_splat_single_precision(self):
+        """Test that filtering in single precision gives similar results."""
+        scans = []
+        for precision in ["float64", "float32"]:
+            scan = Scan(read_data(self.fname))
+            scan.meta.update(self.config)
+            scan.meta["filename"] = self.fname
+            scan.meta["precision"] = precision
+            scan.clean_and_splat(plot=False)
+            scans.append(scan)
+        scan64, scan32 = scans
+        for ch in scan64.chan_columns():
+            assert np.allclose(
+                scan64[ch], scan32[ch], atol=1e-4 * np.std(scan64[ch])
+            )
+
     @pytest.mark.parametrize(
         "fname", ["srt_data.fits", "srt_data_roach_polar.fits"]
     )
@@ -36,3 +36,29 @@ class TestConfig(object):
             config["pixel_size"].to(u.rad).value, np.radians(1 / 60)
         )
         assert config["interpolation"] == "linear"
+
+    def test_read_config_is_cached(self, tmp_path):
+        """Test that config files are only read again if modified."""
+        fname = str(tmp_path / "config.ini")
+        with open(os.path.join(self.datadir, "test_config.ini")) as fobj:
+            contents = fobj.read()
+        with open(fname, "w") as fobj:
+            fobj.write(contents)
+
+        config = read_config(fname)
+        assert read_config(fname) == config
+
+        # Changing the returned copy does not affect the cached entries
+        config["interpolation"] = "linear"
+        config["list_of_directories"].append("X")
+        cached = read_config(fname)
+        assert cached["interpolation"] == "spline"
+        assert "X" not in cached["list_of_directories"]
+
+        with open(fname, "w") as fobj:
+            fobj.write(contents.replace("spline", "linear"))
+        os.utime(fname, (0, os.path.getmtime(fname) + 10))
+
+        new_config = read_config(fname)
+        assert new_config is not config
+        assert new_config["interpolation"] == "linear"
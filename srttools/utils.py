@@ -109,6 +109,22 @@ except ImportError:
         return np.median((np.fabs(data - center)) / c, axis=axis)
 
 
+def _init_scan_worker(config_file=None):
+    """Prepare a worker process that loads scans.
+
+    Worker processes are not always forked, so they do not necessarily
+    share the state of the parent: read the same config file, which also
+    makes it the current one, and use a non-interactive backend, as the
+    workers only save figures.
+    """
+    from .read_config import read_config
+
+    if config_file is not None:
+        read_config(config_file)
+    if HAS_MPL:
+        plt.switch_backend("Agg")
+
+
 def force_move_file(src, dst):
     """Force moving a file, even if it exists.
 
@@ -715,6 +731,9 @@ def get_maxvar_and_direction_from_data(data):
     return np.abs(diff), scan_direction
 
 
+_SCAN_AXES = ("RA", "Dec", "Az", "El")
+
+
 def scantype(ra, dec, az=None, el=None):
     """Get if scan is along RA or Dec, and if forward or backward.
 
@@ -755,20 +774,18 @@ def scantype(ra, dec, az=None, el=None):
     elvar, eldir = get_maxvar_and_direction_from_data(el)
     azvar, azdir = get_maxvar_and_direction_from_data(az)
 
-    direction = np.asarray([["RA", "Dec"], ["Az", "El"]])
-    scandirection = np.asarray([[radir, decdir], [azdir, eldir]])
+    # Plain sequences, in the order RA, Dec, Az, El: no need for string
+    # arrays to pick a single label
+    scandirection = (radir, decdir, azdir, eldir)
 
     vararray = np.asarray([[ravar, decvar], [azvar, elvar]])
     minshift = np.argmin(vararray[:, ::-1])
 
     scanarray = [ra, dec, az, el]
 
-    xvariab = direction.flatten()[minshift]
-    xscandir = scandirection.flatten()[minshift]
-
     x = scanarray[minshift]
 
-    return x, xvariab + xscandir
+    return x, _SCAN_AXES[minshift] + scandirection[minshift]
 
 
 def minmax(array):
@@ -784,14 +801,25 @@ def median_diff(array, sorting=False):
     -1.0
     >>> median_diff([1, 2, 0, 4, -1, -2], sorting=True)
     1.0
+    >>> median_diff([1, np.nan, 2, 4])
+    1.5
+    >>> a = np.array([1, 2, 0, 4, -1, -2])
+    >>> median_diff(a, sorting=True)
+    1.0
+    >>> a[0]
+    1
     """
     if len(array) == 0:
         return 0
-    array = np.array(array)
-    # No NaNs
-    array = array[array == array]
-    if sorting:
-        array = sorted(array)
+    array = np.asarray(array)
+    if array.dtype.kind in "fc":
+        # No NaNs. Boolean indexing returns a copy, that can be sorted in place
+        array = array[~np.isnan(array)]
+        if sorting:
+            array.sort()
+    elif sorting:
+        # Integer input cannot contain NaNs; sort a copy, not the input
+        array = np.sort(array)
     return np.median(np.diff(array))
 
 